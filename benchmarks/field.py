@@ -0,0 +1,57 @@
+"""
+Benchmark special prime field reduction against Python's % operator.
+
+Curves use the generic field unless a special one is passed to Curve
+explicitly, as the folds are interpreted and lose to % on CPython. This
+script shows by how much on the interpreter at hand.
+
+Run from the repository root with
+    python -m benchmarks.field
+"""
+import secrets
+import timeit
+
+from crypto.curves import CURVES
+from crypto.field import PrimeField, select_field
+
+ROUNDS = 100_000
+
+
+def fields(p: int):
+    yield PrimeField(p)
+    yield select_field(p, special=True)
+
+
+def chain(field, values):
+    """
+    Multiply all values together, reducing after every multiplication, or
+    only folding for fields that support lazy reduction.
+    """
+    reduce = getattr(field, "fold", field.reduce)
+    result = 1
+    for value in values:
+        result = reduce(result * value)
+    return field.reduce(result)
+
+
+def main():
+    print(f"{'curve':<10} {'field':<16} {'reduce (ns)':>12} {'chain of 16 (ns)':>17}")
+    for name, params in CURVES.items():
+        p = params["modulus"]
+        x = secrets.randbelow(p) * secrets.randbelow(p)
+        values = [secrets.randbelow(p) for _ in range(16)]
+        for field in fields(p):
+            assert field.reduce(x) == x % p
+            assert chain(field, values) == chain(PrimeField(p), values)
+            reduce = min(timeit.repeat(lambda: field.reduce(x), number=ROUNDS, repeat=3))
+            chained = min(
+                timeit.repeat(lambda: chain(field, values), number=ROUNDS // 16, repeat=3)
+            )
+            print(
+                f"{name:<10} {field.name:<16} {reduce / ROUNDS * 1e9:>12.0f} "
+                f"{chained / (ROUNDS // 16) * 1e9:>17.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Benchmark multi_scalar_mul against separate multiplications.
+
+Run from the repository root with
+    python -m benchmarks.msm [--max-terms N]
+"""
+import argparse
+import secrets
+import time
+
+from crypto.curves import get_curve
+from crypto.ec import Infinity, multi_scalar_mul
+
+SIZES = [2, 4, 8, 16, 32, 64, 128, 256, 1024, 4096, 10_000, 100_000]
+
+# Separate multiplications are only timed up to this many terms, beyond that
+# they take too long to be worth waiting for.
+NAIVE_LIMIT = 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--curve", default="secp256k1")
+    parser.add_argument("--max-terms", type=int, default=SIZES[-1])
+    args = parser.parse_args()
+
+    curve = get_curve(args.curve)
+    sizes = [n for n in SIZES if n <= args.max_terms]
+
+    # Consecutive multiples of the generator are much cheaper to produce than
+    # random points and just as good for timing purposes.
+    points = []
+    point = curve.generator
+    for _ in range(sizes[-1]):
+        points.append(point)
+        point = point + curve.generator
+    scalars = [secrets.randbelow(curve.q) for _ in points]
+    # Build the generator table up front so it does not count towards the first size.
+    multi_scalar_mul(scalars[:1], points[:1])
+
+    print(f"{'terms':>8} {'msm (s)':>10} {'per term (ms)':>14} {'separate (s)':>13}")
+    for n in sizes:
+        start = time.perf_counter()
+        result = multi_scalar_mul(scalars[:n], points[:n])
+        msm = time.perf_counter() - start
+
+        separate = ""
+        if n <= NAIVE_LIMIT:
+            start = time.perf_counter()
+            expected = Infinity()
+            for k, P in zip(scalars[:n], points[:n]):
+                expected = expected + k * P
+            separate = f"{time.perf_counter() - start:13.3f}"
+            assert result == expected
+
+        print(f"{n:>8} {msm:>10.3f} {msm / n * 1000:>14.3f} {separate}")
+
+
+if __name__ == "__main__":
+    main()
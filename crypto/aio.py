@@ -0,0 +1,115 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import partial
+
+from crypto.ec import Point
+from crypto.sig import ECDSA
+
+
+class AsyncECDSA:
+    """
+    AsyncECDSA runs the signing and verification of an ECDSA instance in an
+    executor, so that asyncio code can await them without blocking the event
+    loop.
+
+    executor may be a thread pool, a pool returned by ECDSA.process_pool, or
+    None for the event loop's default executor. As verification is pure
+    Python and holds the GIL, only a process pool keeps it from slowing down
+    the event loop thread.
+
+    At most max_in_flight calls run or wait for their result at a time; any
+    further calls wait for one of them to finish. Calls to verify that arrive
+    within batch_delay seconds of each other are collected, up to max_batch of
+    them, and checked with a single ECDSA.verify_batch (or verify_many in
+    a process pool), which is cheaper per signature for signatures that come
+    with a recovery id.
+    """
+
+    def __init__(
+        self,
+        ecdsa: ECDSA,
+        executor: Executor = None,
+        max_in_flight: int = 256,
+        max_batch: int = 64,
+        batch_delay: float = 0.001,
+    ):
+        if max_in_flight < 1 or max_batch < 1:
+            raise ValueError("max_in_flight and max_batch must be at least 1")
+        self.ecdsa = ecdsa
+        self.executor = executor
+        self.max_batch = max_batch
+        self.batch_delay = batch_delay
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        # Pending verify calls as (item, future), and the timer that flushes them.
+        self._pending = []
+        self._timer = None
+
+    async def sign(self, m: bytes, private_key: int, recoverable: bool = False):
+        """
+        Return ECDSA.sign(m, private_key, recoverable), computed in the executor.
+        """
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            if isinstance(self.executor, ProcessPoolExecutor):
+                # sign_many waits for the process pool, so it runs in a thread.
+                function = partial(
+                    self.ecdsa.sign_many,
+                    [m],
+                    private_key,
+                    recoverable,
+                    executor=self.executor,
+                )
+                return (await loop.run_in_executor(None, function))[0]
+            return await loop.run_in_executor(
+                self.executor, self.ecdsa.sign, m, private_key, recoverable
+            )
+
+    async def verify(
+        self, r: int, s: int, m: bytes, publicKey: Point, recid: int = None
+    ) -> bool:
+        """
+        Return ECDSA.verify(r, s, m, publicKey), computed in the executor as
+        part of a batch. recid is the recovery id of the signature, if known.
+        """
+        # Raise for an invalid public key here rather than fail the batch.
+        self.ecdsa._verify_params(publicKey)
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._pending.append(((r, s, m, publicKey, recid), future))
+            if len(self._pending) >= self.max_batch:
+                self._flush()
+            elif self._timer is None:
+                self._timer = loop.call_later(self.batch_delay, self._flush)
+            return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        items = [item for item, _ in batch]
+        loop = asyncio.get_running_loop()
+        if isinstance(self.executor, ProcessPoolExecutor):
+            function = partial(self.ecdsa.verify_many, items, executor=self.executor)
+            done = loop.run_in_executor(None, function)
+        else:
+            done = loop.run_in_executor(self.executor, self.ecdsa.verify_batch, items)
+        done.add_done_callback(partial(_resolve, [future for _, future in batch]))
+
+
+def _resolve(futures: list, done: asyncio.Future):
+    if done.cancelled():
+        for future in futures:
+            future.cancel()
+        return
+    error = done.exception()
+    for i, future in enumerate(futures):
+        if future.done():
+            continue
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(done.result()[i])
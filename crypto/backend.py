@@ -0,0 +1,99 @@
+import os
+
+# Environment variable selecting the big integer backend, one of "auto",
+# "python" or "gmpy2". "auto" uses gmpy2 when it is installed.
+BACKEND_ENV_VAR = "CRYPTO_EC_BACKEND"
+
+
+class PythonBackend:
+    """
+    PythonBackend does all big integer arithmetic with CPython's int.
+    """
+
+    name = "python"
+
+    def __init__(self):
+        self.mpz = int
+        self.integer_types = (int,)
+
+    def invert(self, a: int, p: int) -> int:
+        return pow(a, -1, p)
+
+    def powmod(self, a: int, e: int, p: int) -> int:
+        return pow(a, e, p)
+
+
+class Gmpy2Backend:
+    """
+    Gmpy2Backend does big integer arithmetic with gmpy2's mpz, which is
+    several times faster than int at the 256 to 512 bit sizes used here.
+
+    Curve parameters are converted to mpz when a curve is built, and since
+    mpz arithmetic with int operands produces mpz, all point arithmetic on
+    that curve then runs on mpz without any change to the formulas.
+    """
+
+    name = "gmpy2"
+
+    def __init__(self):
+        import gmpy2
+
+        self.mpz = gmpy2.mpz
+        self.integer_types = (int, type(gmpy2.mpz(0)))
+        self._invert = gmpy2.invert
+        self._powmod = gmpy2.powmod
+
+    def invert(self, a: int, p: int) -> int:
+        if not a % p:
+            raise ValueError("base is not invertible for the given modulus")
+        return self._invert(a, p)
+
+    def powmod(self, a: int, e: int, p: int) -> int:
+        return self._powmod(a, e, p)
+
+
+BACKENDS = {
+    PythonBackend.name: PythonBackend,
+    Gmpy2Backend.name: Gmpy2Backend,
+}
+
+_backend = None
+
+
+def _load(name: str):
+    if name == "auto":
+        try:
+            return Gmpy2Backend()
+        except ImportError:
+            return PythonBackend()
+
+    if name not in BACKENDS:
+        raise ValueError(
+            f"Backend {name} not supported, must be one of auto, {', '.join(BACKENDS)}"
+        )
+    return BACKENDS[name]()
+
+
+def get_backend():
+    """
+    Return the big integer backend of this process, which is chosen by the
+    CRYPTO_EC_BACKEND environment variable the first time it is needed
+    unless set_backend has been called before.
+    """
+    global _backend
+    if _backend is None:
+        _backend = _load(os.environ.get(BACKEND_ENV_VAR, "auto").lower())
+    return _backend
+
+
+def set_backend(name: str):
+    """
+    Select the big integer backend of this process by name, "auto", "python"
+    or "gmpy2". Selecting gmpy2 when it is not installed raises ImportError.
+
+    Curves keep the backend they were built with, so this should be called
+    before any curve is built.
+    """
+    global _backend
+    _backend = _load(name.lower())
+    return _backend
@@ -0,0 +1,245 @@
+import sqlite3
+import sys
+import threading
+from collections import OrderedDict
+from hashlib import sha256
+
+from crypto.ec import Point, _odd_multiples, WNAF_WIDTH
+
+# Width of the wNAF used with cached public key tables. Building a table of
+# 2^(w-2) odd multiples pays off for keys that are verified against often.
+KEY_TABLE_WIDTH = 7
+
+
+class PublicKeyTableCache:
+    """
+    PublicKeyTableCache keeps precomputed odd multiples of frequently used
+    public keys, so that verifying signatures of the same signer again skips
+    the precomputation and uses a wider wNAF, which needs fewer additions.
+
+    Entries are keyed by the SEC1 encoding of the public key and evicted in
+    least recently used order once their total size exceeds max_bytes.
+    A key is only cached once it has been seen admit_after times, so keys
+    that are verified against once do not push out the frequent ones.
+
+    The hits, misses and evictions counters tell how well the cache is sized.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 32 * 1024 * 1024,
+        width: int = KEY_TABLE_WIDTH,
+        admit_after: int = 2,
+        max_seen: int = 65536,
+    ):
+        self.max_bytes = max_bytes
+        self.width = width
+        self.admit_after = admit_after
+        self.max_seen = max_seen
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.size_bytes = 0
+        self._entries = OrderedDict()
+        # Number of times each recent key that is not cached yet was seen.
+        self._seen = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, publicKey: Point):
+        """
+        Return (multiples, mapped) for the public key, where multiples are its
+        odd multiples and mapped their image under the curve's endomorphism,
+        or None if the curve has none. These are precomputed if the key is
+        cached and computed on the spot otherwise.
+        """
+        key = (publicKey.curve, publicKey.to_bytes())
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            seen = self._seen.pop(key, 0) + 1
+            admit = seen >= self.admit_after
+            if not admit:
+                self._seen[key] = seen
+                while len(self._seen) > self.max_seen:
+                    self._seen.popitem(last=False)
+
+        if not admit:
+            return _tables(publicKey, WNAF_WIDTH)
+
+        tables = _tables(publicKey, self.width)
+        size = _size_of(tables)
+        with self._lock:
+            if key not in self._entries and size <= self.max_bytes:
+                self._entries[key] = (tables, size)
+                self.size_bytes += size
+                while self.size_bytes > self.max_bytes:
+                    _, (_, evicted) = self._entries.popitem(last=False)
+                    self.size_bytes -= evicted
+                    self.evictions += 1
+        return tables
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self),
+            "bytes": self.size_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._seen.clear()
+            self.size_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _tables(publicKey: Point, width: int):
+    curve = publicKey.curve
+    multiples = _odd_multiples(publicKey._jacobian(), width, curve)
+    mapped = None
+    if curve.endomorphism is not None:
+        mapped = curve.endomorphism.apply(multiples, curve.p)
+    return multiples, mapped
+
+
+def _size_of(tables) -> int:
+    """
+    Return an estimate of the memory used by the given tables in bytes.
+    """
+    size = 0
+    for table in tables:
+        if table is None:
+            continue
+        size += sys.getsizeof(table)
+        for point in table:
+            size += sys.getsizeof(point) + sum(sys.getsizeof(c) for c in point[:2])
+    return size
+
+
+class VerificationCache:
+    """
+    VerificationCache remembers signatures that verified successfully, so that
+    a signature seen again, as happens when it is relayed by several peers,
+    is accepted without repeating the verification.
+
+    Entries are keyed by a SHA-256 digest of the curve order, the public key,
+    the message hash and the signature, and the least recently used ones are
+    dropped once there are more than max_entries. Failed verifications are
+    never cached.
+
+    If path is given, entries are also stored in an SQLite database at that
+    path and loaded again when a cache is created for it.
+    """
+
+    def __init__(self, max_entries: int = 65536, path: str = None):
+        self.max_entries = max_entries
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if path is not None:
+            self._open(path)
+
+    def _open(self, path: str):
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS verified "
+            "(id INTEGER PRIMARY KEY, key BLOB UNIQUE NOT NULL)"
+        )
+        self._db.commit()
+        rows = self._db.execute(
+            "SELECT key FROM verified ORDER BY id DESC LIMIT ?", (self.max_entries,)
+        ).fetchall()
+        for (key,) in reversed(rows):
+            self._entries[key] = None
+
+    @staticmethod
+    def key(publicKey: Point, digest: bytes, r: int, s: int) -> bytes:
+        """
+        Return the cache key of the signature (r, s) of the message with
+        hash digest under publicKey.
+        """
+        size = (publicKey.curve.q.bit_length() + 7) // 8
+        h = sha256()
+        h.update(int(publicKey.curve.q).to_bytes(size, "big"))
+        h.update(publicKey.to_bytes())
+        h.update(int(r).to_bytes(size, "big"))
+        h.update(int(s).to_bytes(size, "big"))
+        h.update(digest)
+        return h.digest()
+
+    def check(self, key: bytes) -> bool:
+        """
+        Return True if the signature with the given key verified before.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True
+            self.misses += 1
+            return False
+
+    def add(self, key: bytes):
+        """
+        Record that the signature with the given key verified successfully.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return
+            self._entries[key] = None
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR IGNORE INTO verified (key) VALUES (?)", (key,)
+                )
+                # Keep only the max_entries most recently added rows
+                self._db.execute(
+                    "DELETE FROM verified WHERE id <= "
+                    "(SELECT MAX(id) FROM verified) - ?",
+                    (self.max_entries,),
+                )
+                self._db.commit()
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM verified")
+                self._db.commit()
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,4 +1,12 @@
-from crypto.ec import Curve, Point
+import os
+
+from crypto.backend import get_backend
+from crypto.ec import Curve, Endomorphism, Point
+from crypto.precompute import DEFAULT_WINDOW, CachedFixedBaseTable, FixedBaseTable
+
+# Environment variable naming the directory get_curve keeps generator tables
+# in, see CachedFixedBaseTable. Tables are built in memory if it is not set.
+TABLE_CACHE_ENV_VAR = "CRYPTO_EC_TABLE_CACHE"
 
 CURVES = {
     # See https://en.bitcoin.it/wiki/Secp256k1 for these domain parameters
@@ -13,14 +21,76 @@ CURVES = {
         "order": 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141,
         # 2**256 - 2**32 - 2**9 - 2**8 - 2**7 - 2**6 - 2**4 - 1
         "modulus": 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEFFFFFC2F,
-    }
+        # GLV endomorphism (x, y) -> (beta * x, y) = lambda * (x, y), see
+        # "Guide to Elliptic Curve Cryptography", Example 3.73.
+        "endomorphism": {
+            "beta": 0x7AE96A2B657C07106E64479EAC3434E99CF0497512F58995C1396C28719501EE,
+            "lambda": 0x5363AD4CC05C30E0A5261C028812645A122E22EA20816678DF02967C1B23BD72,
+            # Short basis (a1, b1), (a2, b2) of the lattice of (a, b) with
+            # a + b * lambda = 0 mod order.
+            "basis": (
+                (
+                    0x3086D221A7D46BCDE86C90E49284EB15,
+                    -0xE4437ED6010E88286F547FA90ABFE4C3,
+                ),
+                (
+                    0x114CA50F7A8E2F3F657C1108D9D44CFD8,
+                    0x3086D221A7D46BCDE86C90E49284EB15,
+                ),
+            ),
+        },
+    },
+    # See SEC 2, section 2.4.2 for these domain parameters. This is also
+    # known as NIST P-256.
+    "secp256r1": {
+        "generator": (
+            0x6B17D1F2E12C4247F8BCE6E563A440F277037D812DEB33A0F4A13945D898C296,  # x coordinate
+            0x4FE342E2FE1A7F9B8EE7EB4A7C0F9E162BCE33576B315ECECBB6406837BF51F5,  # y coordinate
+        ),
+        "a": -3,
+        "b": 0x5AC635D8AA3A93E7B3EBBD55769886BC651D06B0CC53B0F63BCE3C3E27D2604B,
+        # Order of the subgroup generated by the generator.
+        "order": 0xFFFFFFFF00000000FFFFFFFFFFFFFFFFBCE6FAADA7179E84F3B9CAC2FC632551,
+        # 2**256 - 2**224 + 2**192 + 2**96 - 1
+        "modulus": 0xFFFFFFFF00000001000000000000000000000000FFFFFFFFFFFFFFFFFFFFFFFF,
+    },
 }
 
 
-def get_curve(name: str) -> Curve:
+# Curves built by get_curve, keyed by (name, window, backend name, cache dir),
+# so that every caller shares the same Curve object and its generator table.
+_REGISTRY = {}
+
+
+def get_curve(name: str, window: int = DEFAULT_WINDOW, cache_dir: str = None) -> Curve:
+    """
+    Return the named curve with its generator attached.
+
+    Curves are interned: asking for the same curve twice returns the same
+    object, which makes curve comparisons an identity check.
+
+    Multiplications of the generator go through a fixed base table with the
+    given window size (see FixedBaseTable), which is built on first use.
+    Larger windows use more memory but need fewer additions; a window of 0
+    disables the table altogether.
+
+    If cache_dir, or else the directory named by the CRYPTO_EC_TABLE_CACHE
+    environment variable, is given, the table is memory mapped from a file in
+    that directory, which is written the first time the table is needed.
+    """
     if name not in CURVES:
         raise ValueError(f"Curve {name} not supported")
+    if cache_dir is None:
+        cache_dir = os.environ.get(TABLE_CACHE_ENV_VAR) or None
+
+    key = (name, window, get_backend().name, cache_dir)
+    curve = _REGISTRY.get(key)
+    if curve is None:
+        curve = _REGISTRY.setdefault(key, _build_curve(name, window, cache_dir))
+    return curve
+
 
+def _build_curve(name: str, window: int, cache_dir: str = None) -> Curve:
     params = CURVES[name]
     curve = Curve(params["a"], params["b"], params["modulus"], q=params["order"])
     generator = Point(
@@ -29,5 +99,18 @@ def get_curve(name: str) -> Curve:
         curve=curve,
     )
     curve.generator = generator
+    curve.name = name
+    if "endomorphism" in params:
+        endomorphism = params["endomorphism"]
+        curve.endomorphism = Endomorphism(
+            endomorphism["beta"],
+            endomorphism["lambda"],
+            endomorphism["basis"],
+            curve.q,
+        )
+    if window and cache_dir is not None:
+        curve.generator_table = CachedFixedBaseTable(generator, window, cache_dir)
+    elif window:
+        curve.generator_table = FixedBaseTable(generator, window)
 
     return curve
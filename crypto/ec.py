@@ -1,3 +1,7 @@
+from crypto.backend import get_backend
+from crypto.field import select_field
+
+
 class Curve:
     """
     An elliptic curve over Z_p, p > 3 is the set of points (x, y) described by the equation
@@ -7,13 +11,49 @@ class Curve:
     is nonzero.
     """
 
-    def __init__(self, a: int, b: int, p: int, q: int = None, generator=None):
+    __slots__ = (
+        "name",
+        "p",
+        "q",
+        "generator",
+        "generator_table",
+        "endomorphism",
+        "a",
+        "b",
+        "formulas",
+        "field",
+        "_double",
+    )
+
+    def __init__(
+        self, a: int, b: int, p: int, q: int = None, generator=None, field=None
+    ):
+        # Parameters use the big integer type of the backend, which then
+        # carries over to all arithmetic on this curve.
+        mpz = get_backend().mpz
+        a, b, p = mpz(a), mpz(b), mpz(p)
+        if q is not None:
+            q = mpz(q)
         self.p = p
+        # Arithmetic modulo p, see crypto.field.select_field. The point
+        # formulas below inline % p, which is what the generic field does.
+        self.field = field if field is not None else select_field(p)
         self.q = q
         self.generator = generator
+        # Optional precomputation used to speed up multiples of the generator,
+        # see crypto.precompute.FixedBaseTable.
+        self.generator_table = None
+        # Optional GLV endomorphism, see Endomorphism.
+        self.endomorphism = None
+        # Name of the curve in crypto.curves.CURVES, set by get_curve.
+        self.name = None
         self._check_curve_parameters(a, b)
         self.a = a
         self.b = b
+        # Name of the point doubling formula picked for this curve, one of
+        # "a=0", "a=-3" or "generic". Addition formulas do not involve a and
+        # are the same for every curve.
+        self.formulas, self._double = _select_doubling(a, p)
 
     def _check_curve_parameters(self, a: int, b: int):
         if (((4 * a**3) + (27 * b**2)) % self.p) == 0:
@@ -25,12 +65,17 @@ class Curve:
         """
         Return true if and only if the given point (x, y) is on this curve.
         """
-        return (((y**2) - (x**3 + self.a * x + self.b)) % self.p) == 0
+        return self.field.reduce((y**2) - (x**3 + self.a * x + self.b)) == 0
 
     def __repr__(self) -> str:
         return f"Curve(a={self.a}, b={self.b})"
 
     def __eq__(self, other) -> bool:
+        # Curves are interned by crypto.curves.get_curve, so this is the
+        # common case.
+        if self is other:
+            return True
+
         if not isinstance(other, Curve):
             return False
 
@@ -44,12 +89,85 @@ class Curve:
     def __neq__(self, other) -> bool:
         return not (self == other)
 
+    def __hash__(self) -> int:
+        return hash((self.a, self.b, self.p, self.q))
+
+
+class Endomorphism:
+    """
+    Endomorphism describes the map (x, y) -> (beta * x, y) available on curves
+    with a = 0 when p = 1 mod 3, where beta is a cube root of unity mod p.
+    On the subgroup of order q it acts as multiplication by lambda, a cube root
+    of unity mod q.
+
+    The GLV method uses it to split a scalar k into two halves k1, k2 of about
+    half the bit length with k = k1 + k2 * lambda mod q, so that
+        k * P = k1 * P + k2 * (beta * x, y)
+    can be computed with a joint multiplication and half as many doublings.
+    """
+
+    def __init__(self, beta: int, lam: int, basis, q: int):
+        """
+        basis is a pair of short vectors (a1, b1), (a2, b2) with
+        a_i + b_i * lambda = 0 mod q.
+        """
+        self.beta = beta
+        self.lam = lam
+        self.basis = basis
+        self.q = q
+
+    def decompose(self, k: int) -> (int, int):
+        """
+        Return (k1, k2) with k = k1 + k2 * lambda mod q. Either may be negative.
+        """
+        (a1, b1), (a2, b2) = self.basis
+        q = self.q
+        k %= q
+        c1 = (b2 * k + q // 2) // q
+        c2 = (-b1 * k + q // 2) // q
+        return k - c1 * a1 - c2 * a2, -c1 * b1 - c2 * b2
+
+    def apply(self, multiples: list, p: int) -> list:
+        """
+        Map the Jacobian points in multiples through the endomorphism, which
+        only needs X * beta since x = X / Z^2.
+        """
+        return [(X * self.beta % p, Y, Z) for X, Y, Z in multiples]
+
 
 def modinv(a: int, p: int):
     """
     Return the inverse of a modulo p.
     """
-    return pow(a, -1, mod=p)
+    return get_backend().invert(a, p)
+
+
+def batch_inverse(values, p: int) -> list:
+    """
+    Return the inverses modulo p of all the given values, mapping zeros to
+    zero, at the cost of a single modular inversion.
+
+    This is Montgomery's trick: with prefix products c_i = a_1 * ... * a_i,
+        1 / a_i = c_(i-1) / c_i
+    and 1 / c_(i-1) = a_i / c_i, so walking backwards from 1 / c_n yields
+    every inverse with three multiplications each.
+    """
+    values = [value % p for value in values]
+    prefix = []
+    product = 1
+    for value in values:
+        if value:
+            product = product * value % p
+        prefix.append(product)
+
+    inverse = modinv(product, p)
+    inverses = [0] * len(values)
+    for i in range(len(values) - 1, -1, -1):
+        value = values[i]
+        if value:
+            inverses[i] = inverse * (prefix[i - 1] if i else 1) % p
+            inverse = inverse * value % p
+    return inverses
 
 
 def bits(n: int):
@@ -61,11 +179,437 @@ def bits(n: int):
         n >>= 1
 
 
+# Jacobian coordinates represent the affine point (x, y) as the triple
+# (X, Y, Z) with x = X / Z^2 and y = Y / Z^3. Addition and doubling in this
+# representation need no modular inversion, so intermediate results of a
+# scalar multiplication are kept as Jacobian triples and only converted back
+# to affine coordinates (one inversion) once the computation is done.
+# Any triple with Z == 0 represents the point at infinity.
+_JACOBIAN_INFINITY = (1, 1, 0)
+
+
+def _jacobian_double(P, curve: Curve):
+    """
+    Return 2P for the Jacobian point P, using the doubling formula selected
+    for the curve.
+    """
+    return curve._double(P, curve)
+
+
+def _jacobian_double_generic(P, curve: Curve):
+    """
+    Return 2P for the Jacobian point P on any curve.
+
+    With S = 4XY^2 and M = 3X^2 + aZ^4 (the numerator of the tangent's slope),
+        2P = (M^2 - 2S, M(S - X3) - 8Y^4, 2YZ)
+    """
+    X, Y, Z = P
+    if not Z or not Y:
+        return _JACOBIAN_INFINITY
+    p = curve.p
+    YY = Y * Y % p
+    S = 4 * X * YY % p
+    M = (3 * X * X + curve.a * pow(Z, 4, p)) % p
+    X3 = (M * M - 2 * S) % p
+    Y3 = (M * (S - X3) - 8 * YY * YY) % p
+    Z3 = 2 * Y * Z % p
+    return (X3, Y3, Z3)
+
+
+def _jacobian_double_a0(P, curve: Curve):
+    """
+    Return 2P for the Jacobian point P on a curve with a = 0, such as
+    secp256k1, where M = 3X^2 does not need Z at all.
+    """
+    X, Y, Z = P
+    if not Z or not Y:
+        return _JACOBIAN_INFINITY
+    p = curve.p
+    YY = Y * Y % p
+    S = 4 * X * YY % p
+    M = 3 * X * X % p
+    X3 = (M * M - 2 * S) % p
+    Y3 = (M * (S - X3) - 8 * YY * YY) % p
+    Z3 = 2 * Y * Z % p
+    return (X3, Y3, Z3)
+
+
+def _jacobian_double_a3(P, curve: Curve):
+    """
+    Return 2P for the Jacobian point P on a curve with a = -3, such as the
+    NIST prime curves, where M = 3X^2 - 3Z^4 = 3(X - Z^2)(X + Z^2).
+    """
+    X, Y, Z = P
+    if not Z or not Y:
+        return _JACOBIAN_INFINITY
+    p = curve.p
+    ZZ = Z * Z % p
+    YY = Y * Y % p
+    S = 4 * X * YY % p
+    M = 3 * (X - ZZ) * (X + ZZ) % p
+    X3 = (M * M - 2 * S) % p
+    Y3 = (M * (S - X3) - 8 * YY * YY) % p
+    Z3 = 2 * Y * Z % p
+    return (X3, Y3, Z3)
+
+
+def _select_doubling(a: int, p: int):
+    """
+    Return the name and function of the cheapest doubling formula for a
+    curve with the given a and p.
+    """
+    if a % p == 0:
+        return "a=0", _jacobian_double_a0
+    if a % p == p - 3:
+        return "a=-3", _jacobian_double_a3
+    return "generic", _jacobian_double_generic
+
+
+def _jacobian_add(P, Q, curve: Curve):
+    """
+    Return P + Q for the Jacobian points P and Q.
+    """
+    X1, Y1, Z1 = P
+    X2, Y2, Z2 = Q
+    if not Z1:
+        return Q
+    if not Z2:
+        return P
+    if Z2 == 1:
+        return _jacobian_add_affine(P, X2, Y2, curve)
+    p = curve.p
+    Z1Z1 = Z1 * Z1 % p
+    Z2Z2 = Z2 * Z2 % p
+    U1 = X1 * Z2Z2 % p
+    U2 = X2 * Z1Z1 % p
+    S1 = Y1 * Z2 * Z2Z2 % p
+    S2 = Y2 * Z1 * Z1Z1 % p
+    H = (U2 - U1) % p
+    r = (S2 - S1) % p
+    if not H:
+        # Either P == Q, which needs the tangent, or P == -Q.
+        return _jacobian_double(P, curve) if not r else _JACOBIAN_INFINITY
+    HH = H * H % p
+    HHH = H * HH % p
+    V = U1 * HH % p
+    X3 = (r * r - HHH - 2 * V) % p
+    Y3 = (r * (V - X3) - S1 * HHH) % p
+    Z3 = Z1 * Z2 * H % p
+    return (X3, Y3, Z3)
+
+
+def _jacobian_add_affine(P, x: int, y: int, curve: Curve):
+    """
+    Return P + (x, y) for the Jacobian point P and the affine point (x, y).
+
+    This is the "mixed" addition, which is cheaper than the general one
+    because the Z coordinate of the second point is known to be 1.
+    """
+    X1, Y1, Z1 = P
+    if not Z1:
+        return (x, y, 1)
+    p = curve.p
+    Z1Z1 = Z1 * Z1 % p
+    U2 = x * Z1Z1 % p
+    S2 = y * Z1 * Z1Z1 % p
+    H = (U2 - X1) % p
+    r = (S2 - Y1) % p
+    if not H:
+        return _jacobian_double(P, curve) if not r else _JACOBIAN_INFINITY
+    HH = H * H % p
+    HHH = H * HH % p
+    V = X1 * HH % p
+    X3 = (r * r - HHH - 2 * V) % p
+    Y3 = (r * (V - X3) - Y1 * HHH) % p
+    Z3 = Z1 * H % p
+    return (X3, Y3, Z3)
+
+
+def _to_affine(P, curve: Curve):
+    """
+    Convert the Jacobian point P back to an affine Point, or to Infinity
+    if P is the point at infinity.
+    """
+    X, Y, Z = P
+    if not Z:
+        return INFINITY
+    p = curve.p
+    z_inv = curve.field.inv(Z)
+    zz_inv = z_inv * z_inv % p
+    return Point._unchecked(X * zz_inv % p, Y * zz_inv * z_inv % p, curve)
+
+
+def _normalize_all(points, curve: Curve) -> list:
+    """
+    Return the given Jacobian points scaled to Z = 1, leaving the point at
+    infinity as it is. All Z coordinates are inverted together, see
+    batch_inverse.
+    """
+    p = curve.p
+    normalized = []
+    for (X, Y, Z), z_inv in zip(points, batch_inverse([Z for _, _, Z in points], p)):
+        if not Z:
+            normalized.append(_JACOBIAN_INFINITY)
+            continue
+        zz_inv = z_inv * z_inv % p
+        normalized.append((X * zz_inv % p, Y * zz_inv * z_inv % p, 1))
+    return normalized
+
+
+def batch_normalize(points, curve: Curve) -> list:
+    """
+    Convert a list of points on the given curve from Jacobian (X, Y, Z)
+    coordinates to affine Points (or Infinity), doing a single modular
+    inversion for the whole list instead of one per point.
+    """
+    return [
+        Point._unchecked(X, Y, curve) if Z else INFINITY
+        for X, Y, Z in _normalize_all(points, curve)
+    ]
+
+
+# Width of the NAF used for multiplying arbitrary points. A width of w needs
+# 2^(w-2) precomputed odd multiples and averages one addition per w+1 bits.
+WNAF_WIDTH = 5
+
+
+def wnaf(scalar: int, width: int) -> list:
+    """
+    Return the width-w non-adjacent form of scalar, starting from the least
+    significant digit.
+
+    Every nonzero digit is odd with absolute value below 2^(w-1) and is
+    followed by at least w-1 zero digits.
+    """
+    digits = []
+    full = 1 << width
+    half = full >> 1
+    while scalar:
+        if scalar & 1:
+            digit = scalar & (full - 1)
+            if digit >= half:
+                digit -= full
+            scalar -= digit
+        else:
+            digit = 0
+        digits.append(digit)
+        scalar >>= 1
+    return digits
+
+
+def _jacobian_neg(P, curve: Curve):
+    X, Y, Z = P
+    return (X, -Y % curve.p, Z)
+
+
+def _odd_multiples(P, width: int, curve: Curve) -> list:
+    """
+    Return [P, 3P, 5P, ..., (2^(w-1) - 1)P] for the Jacobian point P.
+
+    The multiples are normalized to Z = 1, so that adding them to a running
+    sum is a mixed addition.
+    """
+    twice = _jacobian_double(P, curve)
+    multiples = [P]
+    for _ in range((1 << (width - 2)) - 1):
+        multiples.append(_jacobian_add(multiples[-1], twice, curve))
+    return _normalize_all(multiples, curve)
+
+
+def _strauss_mul(terms, curve: Curve):
+    """
+    Return sum(k_i * P_i) in Jacobian coordinates, where terms is a list of
+    (k_i, multiples_i) pairs with multiples_i the odd multiples of P_i as
+    returned by _odd_multiples.
+
+    This is the Strauss-Shamir trick: the wNAF digits of all scalars are
+    processed together so that the terms share a single chain of doublings.
+    The width used for each scalar is the one its table of multiples was
+    built for.
+    """
+    recoded = []
+    for scalar, multiples in terms:
+        width = len(multiples).bit_length() + 1
+        negatives = [_jacobian_neg(Q, curve) for Q in multiples]
+        if scalar < 0:
+            scalar = -scalar
+            multiples, negatives = negatives, multiples
+        recoded.append((wnaf(scalar, width), multiples, negatives))
+
+    double = curve._double
+    result = _JACOBIAN_INFINITY
+    for i in range(max(len(digits) for digits, _, _ in recoded) - 1, -1, -1):
+        result = double(result, curve)
+        for digits, positive, negative in recoded:
+            if i < len(digits):
+                digit = digits[i]
+                if digit > 0:
+                    result = _jacobian_add(result, positive[digit >> 1], curve)
+                elif digit < 0:
+                    result = _jacobian_add(result, negative[-digit >> 1], curve)
+    return result
+
+
+def _point_multiples(point, width: int = WNAF_WIDTH) -> list:
+    """
+    Return the odd multiples of point for use with _strauss_mul.
+
+    For the generator these come for free from its fixed base table, whose
+    first row holds d * G for every digit d, so they are not recomputed.
+    """
+    curve = point.curve
+    if point is curve.generator and curve.generator_table is not None:
+        return curve.generator_table.odd_multiples()
+    return _odd_multiples(point._jacobian(), width, curve)
+
+
+def _mul_terms(scalar: int, multiples: list, curve: Curve, mapped: list = None) -> list:
+    """
+    Return the _strauss_mul terms for scalar * P, given the odd multiples of P.
+
+    On curves with an endomorphism the scalar is split in two halves (GLV),
+    otherwise this is the single term (scalar, multiples). mapped may hold
+    the image of multiples under the endomorphism if it is already known.
+    """
+    endomorphism = curve.endomorphism
+    if endomorphism is None:
+        return [(scalar, multiples)]
+    if mapped is None:
+        mapped = endomorphism.apply(multiples, curve.p)
+    k1, k2 = endomorphism.decompose(scalar)
+    return [(k1, multiples), (k2, mapped)]
+
+
+def _jacobian_x_equals(P, x: int, curve: Curve) -> bool:
+    """
+    Return True if and only if the affine x coordinate of the Jacobian point P
+    is x. Since x(P) = X / Z^2 this only needs X == x * Z^2, not an inversion.
+    """
+    X, _, Z = P
+    if not Z:
+        return False
+    p = curve.p
+    return (x * Z * Z - X) % p == 0
+
+
+def _ladder_mul(point, scalar: int, curve: Curve):
+    """
+    Return scalar * point in Jacobian coordinates using the Montgomery ladder
+    with co-Z formulas, see "Co-Z Addition Formulae and Binary Ladders on
+    Elliptic Curves" by Goundar, Joye and Miyaji.
+
+    The ladder keeps R1 - R0 = point and, for each bit b of the scalar, sets
+    R_(1-b) = R0 + R1 and R_b = 2 R_b. With R0 and R1 sharing their Z
+    coordinate this is done as one co-Z addition with conjugate (XYcZ-ADDC)
+    followed by one co-Z addition (XYcZ-ADD), so every bit costs the same.
+    To make the number of bits independent of the scalar as well, q or 2q is
+    added to it so that it always has exactly one bit more than q.
+
+    This only structures the computation uniformly: CPython's big integer
+    arithmetic itself does not run in constant time.
+    """
+    q = curve.q
+    if q is None:
+        raise ValueError("The Montgomery ladder needs a curve with a known order q")
+    n = q.bit_length()
+    k = scalar % q + q
+    if not k >> n:
+        k += q
+
+    p = curve.p
+    x, y = point.x, point.y
+    # XYcZ-IDBL: R1 = 2P and R0 = P, both with Z = 2y.
+    YY = y * y % p
+    S = 4 * x * YY % p
+    M = (3 * x * x + curve.a) % p
+    X2 = (M * M - 2 * S) % p
+    R = [(S, 8 * YY * YY % p), (X2, (M * (S - X2) - 8 * YY * YY) % p)]
+    Z = 2 * y % p
+
+    for i in range(n - 1, -1, -1):
+        b = (k >> i) & 1
+        X1, Y1 = R[b]
+        X2, Y2 = R[1 - b]
+
+        # XYcZ-ADDC(R_b, R_(1-b)) = (R_b + R_(1-b), R_b - R_(1-b))
+        dX = (X1 - X2) % p
+        if not dX:
+            break
+        C = dX * dX % p
+        W1 = X1 * C % p
+        W2 = X2 * C % p
+        A1 = Y1 * (W1 - W2) % p
+        dY = Y1 - Y2
+        sY = Y1 + Y2
+        Xs = (dY * dY - W1 - W2) % p
+        Ys = (dY * (W1 - Xs) - A1) % p
+        Xd = (sY * sY - W1 - W2) % p
+        Yd = (sY * (W1 - Xd) - A1) % p
+
+        # XYcZ-ADD(sum, difference) = (2 R_b, sum with the new Z)
+        dX2 = (Xd - Xs) % p
+        if not dX2:
+            break
+        C = dX2 * dX2 % p
+        W1 = Xs * C % p
+        W2 = Xd * C % p
+        A1 = Ys * (W2 - W1) % p
+        dY = Yd - Ys
+        X3 = (dY * dY - W1 - W2) % p
+        R[b] = (X3, (dY * (W1 - X3) - A1) % p)
+        R[1 - b] = (W1, A1)
+        Z = Z * dX * dX2 % p
+    else:
+        return (R[0][0], R[0][1], Z)
+
+    # The co-Z formulas cannot add points with equal x coordinates, which
+    # only happens for a handful of scalars, e.g when R0 = -R1. Finish
+    # those with the general formulas.
+    R0 = (R[0][0], R[0][1], Z)
+    R1 = (R[1][0], R[1][1], Z)
+    for i in range(i, -1, -1):
+        if (k >> i) & 1:
+            R0 = _jacobian_add(R0, R1, curve)
+            R1 = _jacobian_double(R1, curve)
+        else:
+            R1 = _jacobian_add(R0, R1, curve)
+            R0 = _jacobian_double(R0, curve)
+    return R0
+
+
+def _coordinate_size(curve: Curve) -> int:
+    """
+    Return the number of bytes of an encoded field element of the curve.
+    """
+    return (curve.p.bit_length() + 7) // 8
+
+
+def _lift_x(x: int, parity: int, curve: Curve):
+    """
+    Return the point on curve with the given x coordinate whose y coordinate
+    has the given parity, or None if there is no such point.
+    """
+    y = curve.field.sqrt(x * x * x + curve.a * x + curve.b)
+    if y is None:
+        return None
+    if (y & 1) != parity:
+        # -0 = 0 is even, so there is no point with y = 0 and odd parity
+        if not y:
+            return None
+        y = curve.p - y
+    return Point._unchecked(x, y, curve)
+
+
 class Point:
     """
     Point represents a point on an elliptic curve.
+
+    Its coordinates are always plain ints, whatever big integer backend the
+    curve computes with.
     """
 
+    __slots__ = ("x", "y", "curve")
+
     def __init__(self, x: int, y: int, curve: Curve):
         """
         Construct a Point object with the given parameters.
@@ -74,39 +618,50 @@ class Point:
         """
         if not curve.is_point(x, y):
             raise ValueError(f"Given point ({x}, {y}) not on given curve {curve}")
-        self.x = x
-        self.y = y
+        self.x = int(x)
+        self.y = int(y)
         self.curve = curve
 
+    @classmethod
+    def _unchecked(cls, x: int, y: int, curve: Curve):
+        """
+        Construct a Point without checking that it is on the curve.
+
+        This is for results of the group operations, which are on the curve
+        by construction, so that they do not pay for the curve equation.
+        """
+        point = object.__new__(cls)
+        point.x = int(x)
+        point.y = int(y)
+        point.curve = curve
+        return point
+
     def double(self):
         """
         Double doubles this point and returns a new point representing
         the doubled value.
         This is equivalent to doing P + P for a point P on the curve.
         """
-        return self + self
+        return _to_affine(_jacobian_double(self._jacobian(), self.curve), self.curve)
 
     def __eq__(self, other) -> bool:
-        if isinstance(other, Infinity) or (not isinstance(other, Point)):
+        if self is other:
+            return True
+
+        if not isinstance(other, Point):
             return False
 
-        return self.x == other.x and self.y == other.y and self.curve == other.curve
+        return (
+            self.x == other.x
+            and self.y == other.y
+            and (self.curve is other.curve or self.curve == other.curve)
+        )
 
-    def __slope(self, p, q) -> int:
+    def _jacobian(self):
         """
-        Calculate the slope of the line connecting p and q, or the slope
-        of the tangent to the curve if p == q.
+        Return this point in Jacobian coordinates, i.e (x, y, 1).
         """
-        if p == q:
-            # Same point on the curve, should use m = (3x^2 + a) / 2y as slope,
-            # otherwise the regular equation would divide by zero.
-            # (3 * p.x**2 + self.curve.a) * mod_inv(2 * p.y, self.p)
-            return (
-                (3 * p.x**2 + self.curve.a) * modinv(2 * p.y, self.curve.p)
-            ) % self.curve.p
-        else:
-            # different points on curve, should use m = (y_p - y_q) / (x_p - x_q)
-            return ((p.y - q.y) * modinv(p.x - q.x, self.curve.p)) % self.curve.p
+        return (self.x, self.y, 1)
 
     def __add__(self, other):
         """
@@ -117,32 +672,17 @@ class Point:
         """
 
         # Adding the additive identity is a no-op
-        if other == Infinity():
+        if other is INFINITY:
             return self
 
         if not isinstance(other, Point):
             raise ValueError(f"Can only add Point objects with other Point objects")
 
-        if self.curve != other.curve:
+        if self.curve is not other.curve and self.curve != other.curve:
             raise ValueError(f"Curves not equal: {self.curve} != {other.curve}")
 
-        if self.x == other.x and self.y != other.y:
-            return Infinity()
-
-        m = self.__slope(self, other)
-
-        # Calculate x_r = m^2 - x_p - x_q
-        # Retrieved by solving the cubic equation where the line intersects with
-        # the curve, with x_r, x_p, and x_q as the roots and x_r + x_p + x_q = -b/a
-        # in the cubic equation.
-        x_r = (m**2 - self.x - other.x) % self.curve.p
-
-        # Calculate y_r = y_p + m(x_r - x_q)
-        # y_r = -(self.y + m * (x_r - self.x)) % self.p
-        y_r = (m * (self.x - x_r) - self.y) % self.curve.p
-
-        # The result point is going to be at (x_r, y_r)
-        return Point(x_r, y_r, self.curve)
+        R = _jacobian_add_affine(self._jacobian(), other.x, other.y, self.curve)
+        return _to_affine(R, self.curve)
 
     def __radd__(self, other):
         return self.__add__(other)
@@ -150,29 +690,96 @@ class Point:
     def __repr__(self):
         return f"Point(x={self.x}, y={self.y})"
 
+    def to_bytes(self, compressed: bool = True) -> bytes:
+        """
+        Return the SEC1 encoding of this point: 0x02 or 0x03 (for even and odd
+        y) followed by x if compressed, 0x04 followed by x and y otherwise.
+        """
+        size = _coordinate_size(self.curve)
+        x = self.x.to_bytes(size, "big")
+        if compressed:
+            return bytes((2 + (self.y & 1),)) + x
+        return b"\x04" + x + self.y.to_bytes(size, "big")
+
+    @classmethod
+    def from_bytes(cls, data, curve: Curve):
+        """
+        Decode a point on the given curve from its SEC1 encoding, which may be
+        compressed or uncompressed and is given as any bytes-like object.
+        The single byte 0x00 decodes to the point at infinity.
+
+        If the encoding is malformed or the point is not on the curve,
+        a ValueError is raised.
+        """
+        size = _coordinate_size(curve)
+        if len(data) == 1 and data[0] == 0:
+            return INFINITY
+        if not len(data):
+            raise ValueError("Cannot decode a point from empty data")
+
+        prefix = data[0]
+        if prefix in (2, 3) and len(data) == 1 + size:
+            x = int.from_bytes(data[1:], "big")
+            if x >= curve.p:
+                raise ValueError(f"Given x coordinate {x} not in the field")
+            point = _lift_x(x, prefix & 1, curve)
+            if point is None:
+                raise ValueError(f"Given x coordinate {x} not on given curve {curve}")
+            return point
+        if prefix == 4 and len(data) == 1 + 2 * size:
+            x = int.from_bytes(data[1 : 1 + size], "big")
+            y = int.from_bytes(data[1 + size :], "big")
+            if x >= curve.p or y >= curve.p:
+                raise ValueError(f"Given point ({x}, {y}) not in the field")
+            return cls(x, y, curve)
+        raise ValueError(
+            f"Invalid SEC1 encoding with prefix {prefix:#04x} and length {len(data)}"
+        )
+
     def __rmul__(self, scalar: int):
-        if not isinstance(scalar, int):
+        return self.mul(scalar)
+
+    def mul(self, scalar: int, ladder: bool = False):
+        """
+        Return scalar * self.
+
+        By default the fastest available method is used, whose running time
+        depends on the scalar. With ladder=True the Montgomery ladder is used
+        instead, which performs the same sequence of point operations for every
+        scalar. That does not make it constant time, as CPython's integer
+        arithmetic is not, and the ladder falls back to the general formulas
+        in a rare special case; see _ladder_mul.
+        """
+        if not isinstance(scalar, get_backend().integer_types):
             raise ValueError("Can only multiply by an integer")
 
-        result = Infinity()
-        addend = self
+        return _to_affine(self._mul_jacobian(scalar, ladder), self.curve)
+
+    def _mul_jacobian(self, scalar: int, ladder: bool = False):
+        """
+        Return scalar * self in Jacobian coordinates.
+        """
+        curve = self.curve
+        if ladder:
+            return _ladder_mul(self, scalar, curve)
+
+        if self is curve.generator and curve.generator_table is not None:
+            return curve.generator_table.mul_jacobian(scalar)
+
+        multiples = _odd_multiples(self._jacobian(), WNAF_WIDTH, curve)
+        return _strauss_mul(_mul_terms(scalar, multiples, curve), curve)
 
-        for bit in bits(scalar):
-            if bit == 1:
-                result += addend
-            addend += addend
+    def __neg__(self):
+        return Point._unchecked(self.x, -self.y % self.curve.p, self.curve)
 
-        return result
+    def __sub__(self, other):
+        if other is INFINITY:
+            return self
+
+        if not isinstance(other, Point):
+            raise ValueError("Can only subtract Point objects from Point objects")
 
-        # Equivalent Implementation from "Understanding Cryptography"
-        # by Paar and Pelzl
-        # T = self
-        # scalar_bits = bin(scalar).replace("0b", "")
-        # for bit in scalar_bits[1:]:
-        #     T += T
-        #     if bit == "1":
-        #         T += self
-        # return T
+        return self + (-other)
 
 
 class Infinity:
@@ -181,12 +788,204 @@ class Infinity:
     acts as the additive identity of the group, i.e
         Inf + P = P + Inf = P
     For all P in the elliptic curve group.
+
+    There is only ever one instance, INFINITY, which Infinity() returns.
     """
 
+    __slots__ = ()
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
     def __eq__(self, o):
-        if isinstance(o, Infinity):
-            return True
-        return False
+        return o is self
 
     def __ne__(self, o):
-        return not (self == o)
+        return o is not self
+
+    def __hash__(self):
+        return id(self)
+
+    def __repr__(self):
+        return "Infinity()"
+
+    def to_bytes(self, compressed: bool = True) -> bytes:
+        """
+        Return the SEC1 encoding of the point at infinity, a single zero byte.
+        """
+        return b"\x00"
+
+    def double(self):
+        return self
+
+    def __neg__(self):
+        return self
+
+    def __add__(self, other):
+        if other is self or isinstance(other, Point):
+            return other
+        raise ValueError("Can only add Point objects with other Point objects")
+
+    def __radd__(self, other):
+        return self.__add__(other)
+
+    def __sub__(self, other):
+        return -self.__add__(other)
+
+    def __rmul__(self, scalar: int):
+        if not isinstance(scalar, get_backend().integer_types):
+            raise ValueError("Can only multiply by an integer")
+        return self
+
+
+INFINITY = Infinity()
+
+
+# Below this many terms multi_scalar_mul uses Strauss-Shamir, whose cost per
+# term is lower but which cannot share work between terms the way the buckets
+# of Pippenger's method do.
+PIPPENGER_THRESHOLD = 32
+
+
+def multi_scalar_mul(scalars, points):
+    """
+    Return sum(k_i * P_i) for the given scalars k_i and points P_i, which must
+    all lie on the same curve.
+
+    Small inputs are computed with Strauss-Shamir and larger ones with
+    Pippenger's bucket method, whose window size is chosen from the number
+    of terms.
+    """
+    scalars = list(scalars)
+    points = list(points)
+    if len(scalars) != len(points):
+        raise ValueError(
+            f"Got {len(scalars)} scalars but {len(points)} points, must be equal"
+        )
+
+    terms = []
+    curve = None
+    for scalar, point in zip(scalars, points):
+        if not isinstance(scalar, get_backend().integer_types):
+            raise ValueError("Can only multiply by an integer")
+        if point is INFINITY:
+            continue
+        if not isinstance(point, Point):
+            raise ValueError("Can only multiply Point objects")
+        if curve is None:
+            curve = point.curve
+        elif point.curve != curve:
+            raise ValueError(f"Curves not equal: {curve} != {point.curve}")
+        if scalar:
+            terms.append((scalar, point))
+
+    if not terms:
+        return INFINITY
+
+    return _to_affine(_multi_mul(terms, curve), curve)
+
+
+def _multi_mul(terms, curve: Curve):
+    """
+    Return sum(k_i * P_i) in Jacobian coordinates for the (k_i, P_i) in terms,
+    where every k_i is nonzero and every P_i is an affine Point on curve.
+    """
+    if len(terms) < PIPPENGER_THRESHOLD:
+        strauss_terms = []
+        for scalar, point in terms:
+            strauss_terms += _mul_terms(scalar, _point_multiples(point), curve)
+        return _strauss_mul(strauss_terms, curve)
+
+    return _pippenger_mul(terms, curve)
+
+
+def _pippenger_window(n: int, bit_length: int) -> int:
+    """
+    Return the window c minimizing the number of additions done by Pippenger's
+    method on n terms of the given bit length, which is about
+        ceil(bit_length / c) * (n + 2^(c + 1))
+    """
+    return min(
+        range(1, 24),
+        key=lambda c: -(-bit_length // c) * (n + (1 << (c + 1))),
+    )
+
+
+def _pippenger_mul(terms, curve: Curve):
+    """
+    Return sum(k_i * P_i) in Jacobian coordinates for the (k_i, P_i) in terms
+    using Pippenger's bucket method.
+
+    The scalars are cut into windows of c bits. For every window, each point
+    is added to the bucket indexed by its scalar's digit, after which
+        sum(d * bucket[d]) = sum(running sums of the buckets from the top)
+    costs only 2^(c + 1) additions, however many points there are. The windows
+    are combined from the most significant one with c doublings each.
+    """
+    p = curve.p
+    affine = []
+    for scalar, point in terms:
+        if curve.endomorphism is not None:
+            k1, k2 = curve.endomorphism.decompose(scalar)
+            split = [(k1, point.x), (k2, curve.endomorphism.beta * point.x % p)]
+        else:
+            split = [(scalar, point.x)]
+        for k, x in split:
+            if k < 0:
+                affine.append((-k, x, -point.y % p))
+            elif k:
+                affine.append((k, x, point.y))
+
+    if not affine:
+        return _JACOBIAN_INFINITY
+
+    bit_length = max(k for k, _, _ in affine).bit_length()
+    width = _pippenger_window(len(affine), bit_length)
+    mask = (1 << width) - 1
+
+    double = curve._double
+    result = _JACOBIAN_INFINITY
+    for shift in range(width * ((bit_length - 1) // width), -1, -width):
+        for _ in range(width):
+            result = double(result, curve)
+
+        buckets = [_JACOBIAN_INFINITY] * mask
+        for k, x, y in affine:
+            digit = (k >> shift) & mask
+            if digit:
+                buckets[digit - 1] = _jacobian_add_affine(buckets[digit - 1], x, y, curve)
+
+        running = _JACOBIAN_INFINITY
+        window_sum = _JACOBIAN_INFINITY
+        for bucket in reversed(buckets):
+            running = _jacobian_add(running, bucket, curve)
+            window_sum = _jacobian_add(window_sum, running, curve)
+        result = _jacobian_add(result, window_sum, curve)
+
+    return result
+
+
+def decode_points(encodings, curve: Curve, allow_infinity: bool = False) -> list:
+    """
+    Decode and validate a batch of SEC1 encoded points on the given curve,
+    see Point.from_bytes.
+
+    The point at infinity is not a valid public key, so its encoding is
+    rejected unless allow_infinity is set.
+
+    If any of the encodings is invalid a ValueError naming its index is raised.
+    """
+    points = []
+    for i, data in enumerate(encodings):
+        try:
+            point = Point.from_bytes(data, curve)
+            if point is INFINITY and not allow_infinity:
+                raise ValueError("Point at infinity not allowed")
+            points.append(point)
+        except ValueError as e:
+            raise ValueError(f"Invalid point at index {i}: {e}") from e
+    return points
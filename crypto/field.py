@@ -0,0 +1,202 @@
+from crypto.backend import get_backend
+
+
+class PrimeField:
+    """
+    PrimeField implements arithmetic modulo a prime p using Python's own
+    integer operations, i.e reduction with the % operator.
+    """
+
+    name = "generic"
+
+    def __init__(self, p: int):
+        self.p = p
+        # Decomposition p - 1 = odd * 2^two_adicity and a quadratic
+        # non-residue, used by Tonelli-Shanks and computed on first use.
+        self._tonelli_shanks = None
+
+    def reduce(self, x: int) -> int:
+        """
+        Return x mod p.
+        """
+        return x % self.p
+
+    def mul(self, a: int, b: int) -> int:
+        return self.reduce(a * b)
+
+    def inv(self, a: int) -> int:
+        """
+        Return the inverse of a modulo p.
+        """
+        return get_backend().invert(a, self.p)
+
+    def sqrt(self, a: int):
+        """
+        Return a square root of a modulo p, or None if a is not a square.
+
+        For p = 3 mod 4, as for secp256k1 and P-256, the root is simply
+        a^((p + 1) / 4). Other primes use the Tonelli-Shanks algorithm.
+        """
+        p = self.p
+        a %= p
+        if p % 4 == 3:
+            root = get_backend().powmod(a, (p + 1) // 4, p)
+        else:
+            root = self._sqrt_tonelli_shanks(a)
+        if root is None or root * root % p != a:
+            return None
+        return root
+
+    def _sqrt_tonelli_shanks(self, a: int):
+        p = self.p
+        powmod = get_backend().powmod
+        if not a:
+            return 0
+        if powmod(a, (p - 1) // 2, p) != 1:
+            return None
+
+        if self._tonelli_shanks is None:
+            odd, two_adicity = p - 1, 0
+            while not odd & 1:
+                odd >>= 1
+                two_adicity += 1
+            non_residue = 2
+            while powmod(non_residue, (p - 1) // 2, p) != p - 1:
+                non_residue += 1
+            self._tonelli_shanks = (odd, two_adicity, non_residue)
+        odd, m, non_residue = self._tonelli_shanks
+
+        c = powmod(non_residue, odd, p)
+        t = powmod(a, odd, p)
+        root = powmod(a, (odd + 1) // 2, p)
+        while t != 1:
+            # Find the least i with t^(2^i) = 1
+            i, t2 = 0, t
+            while t2 != 1:
+                t2 = t2 * t2 % p
+                i += 1
+            b = powmod(c, 1 << (m - i - 1), p)
+            m = i
+            c = b * b % p
+            t = t * c % p
+            root = root * b % p
+        return root
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(p={self.p})"
+
+
+class PseudoMersenneField(PrimeField):
+    """
+    PseudoMersenneField implements arithmetic modulo a prime of the form
+        p = 2^k - c
+    for a small c, such as the secp256k1 modulus 2^256 - 2^32 - 977.
+
+    Writing x = h * 2^k + l we have x = l + h * c mod p, which folds the high
+    bits of x back in with a shift, a mask and a multiplication by the small c
+    instead of a division. Every fold shrinks x by about k - log2(c) bits.
+    """
+
+    name = "pseudo-mersenne"
+
+    def __init__(self, p: int):
+        super().__init__(p)
+        self.k = p.bit_length()
+        self.c = (1 << self.k) - p
+        self.mask = (1 << self.k) - 1
+
+    def fold(self, x: int) -> int:
+        """
+        Return a value congruent to the nonnegative x modulo p that is less
+        than 2^(k+1), without fully reducing it.
+
+        This is enough for lazy reduction: products of folded values can be
+        folded again, and only the final result of a chain of multiplications
+        needs a full reduction.
+        """
+        k, c, mask = self.k, self.c, self.mask
+        while x >> (k + 1):
+            x = (x & mask) + (x >> k) * c
+        return x
+
+    def reduce(self, x: int) -> int:
+        if x < 0:
+            return x % self.p
+        x = self.fold(x)
+        while x >= self.p:
+            x -= self.p
+        return x
+
+
+class SolinasField(PseudoMersenneField):
+    """
+    SolinasField implements arithmetic modulo a generalized Mersenne (Solinas)
+    prime, p = 2^k - c where c is a short signed sum of powers of two, such as
+    the NIST P-256 modulus 2^256 - 2^224 + 2^192 + 2^96 - 1.
+
+    Folding works as for pseudo-Mersenne primes, except that h * c is computed
+    with shifts and additions only.
+    """
+
+    name = "solinas"
+
+    def __init__(self, p: int, terms):
+        """
+        terms is a list of (sign, exponent) pairs with
+            c = sum(sign * 2^exponent)
+        """
+        super().__init__(p)
+        self.terms = terms
+
+    def fold(self, x: int) -> int:
+        k, mask = self.k, self.mask
+        while x >> (k + 1):
+            h = x >> k
+            x &= mask
+            for sign, exponent in self.terms:
+                if sign > 0:
+                    x += h << exponent
+                else:
+                    x -= h << exponent
+        return x
+
+
+def _signed_terms(c: int) -> list:
+    """
+    Return c as a list of (sign, exponent) pairs in non-adjacent form, which
+    has the fewest nonzero terms.
+    """
+    terms = []
+    exponent = 0
+    while c:
+        if c & 1:
+            sign = 2 - (c & 3)
+            terms.append((sign, exponent))
+            c -= sign
+        c >>= 1
+        exponent += 1
+    return terms
+
+
+def select_field(p: int, special: bool = False) -> PrimeField:
+    """
+    Return a field implementation for the prime p.
+
+    This is the generic field unless special=True, in which case primes of
+    pseudo-Mersenne or Solinas shape get their special reduction. CPython's %
+    is implemented in C while the folds are interpreted, so for 256-bit primes
+    the generic field is faster; see benchmarks/field.py to measure this.
+    """
+    if not special:
+        return PrimeField(p)
+    k = p.bit_length()
+    c = (1 << k) - p
+    if k < 64 or c <= 0:
+        return PrimeField(p)
+
+    if c.bit_length() <= k // 2:
+        return PseudoMersenneField(p)
+    terms = _signed_terms(c)
+    if len(terms) > 5:
+        return PrimeField(p)
+    return SolinasField(p, terms)
@@ -0,0 +1,172 @@
+import os
+import threading
+import weakref
+from collections import deque
+
+from crypto.ec import Curve, _normalize_all, batch_inverse
+from crypto.rand import gen_nonce
+
+# Number of nonces computed at a time when refilling a pool. The pool's lock
+# is only held to append a whole chunk, not while it is computed.
+REFILL_CHUNK = 16
+
+# Every live pool, so that they can all be emptied in a forked child.
+_POOLS = weakref.WeakSet()
+
+
+class NoncePool:
+    """
+    NoncePool precomputes the part of an ECDSA signature that does not depend
+    on the message, which is almost all of the work: for a random nonce k it
+    computes R = kG, r = x(R) mod q and k^-1 mod q. Signing with a pooled
+    nonce then only takes two multiplications modulo q.
+
+    The pool is refilled up to size entries by a background thread whenever
+    it drops below low_watermark entries. If it runs empty, nonces are
+    computed inline.
+
+    Every nonce is handed out at most once. The pool is emptied in the child
+    after a fork, since parent and child would otherwise sign with the same
+    nonces, which reveals the private key, and it refuses to be pickled.
+    """
+
+    def __init__(
+        self,
+        curve: Curve,
+        size: int = 64,
+        low_watermark: int = None,
+        ladder: bool = True,
+        background: bool = True,
+    ):
+        """
+        ladder selects the Montgomery ladder for computing kG, see
+        Point.mul. With background=False the pool is only filled by fill.
+        """
+        if size < 1:
+            raise ValueError(f"Pool size must be at least 1, got {size}")
+        self.curve = curve
+        self.size = size
+        self.low_watermark = size // 4 if low_watermark is None else low_watermark
+        self.ladder = ladder
+        self.background = background
+        self._closed = False
+        self._reset()
+        _POOLS.add(self)
+
+    def _reset(self):
+        self._nonces = deque()
+        self._lock = threading.Lock()
+        self._refill = threading.Event()
+        self._thread = None
+        self._pid = os.getpid()
+
+    def take(self) -> (int, int, int):
+        """
+        Remove a precomputed nonce from the pool and return it as the tuple
+        (k^-1 mod q, r, recid), where recid is the recovery id of R.
+        The nonce k itself is not kept, since signing does not need it.
+        """
+        if self._pid != os.getpid():
+            self._reset()
+        with self._lock:
+            nonce = self._nonces.popleft() if self._nonces else None
+            low = len(self._nonces) < self.low_watermark
+        if low and self.background and not self._closed:
+            self._start()
+            self._refill.set()
+        if nonce is None:
+            nonce = self._generate(1)[0]
+        return nonce
+
+    def fill(self):
+        """
+        Fill the pool up to its size in the calling thread. A closed pool is
+        not filled; a fill in progress stops when the pool is closed.
+        """
+        while True:
+            with self._lock:
+                if self._closed:
+                    return
+                missing = self.size - len(self._nonces)
+            if missing <= 0:
+                return
+            nonces = self._generate(min(missing, REFILL_CHUNK))
+            with self._lock:
+                # Nonces computed while the pool was being closed are dropped.
+                if self._closed:
+                    return
+                self._nonces.extend(nonces)
+
+    def close(self):
+        """
+        Stop the background thread and discard all precomputed nonces.
+        """
+        with self._lock:
+            self._closed = True
+            self._nonces.clear()
+        self._refill.set()
+
+    def __len__(self) -> int:
+        return len(self._nonces)
+
+    def __reduce__(self):
+        raise TypeError("NoncePool cannot be pickled, its nonces must not be shared")
+
+    def _generate(self, n: int) -> list:
+        """
+        Compute n nonces, inverting all the nonces and normalizing all the
+        points R together.
+        """
+        curve = self.curve
+        q = curve.q
+        ks = [gen_nonce(curve) for _ in range(n)]
+        Rs = _normalize_all(
+            [curve.generator._mul_jacobian(k, self.ladder) for k in ks], curve
+        )
+        nonces = []
+        for k_inv, (x, y, _) in zip(batch_inverse(ks, q), Rs):
+            r = x % q
+            # A nonce with r = 0 cannot be used for signing
+            if r:
+                nonces.append((k_inv, r, (y & 1) | (2 if x >= q else 0)))
+        return nonces or self._generate(n)
+
+    def _start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=_refill_loop, args=(weakref.ref(self),), daemon=True
+            )
+        self._thread.start()
+
+
+def _refill_loop(pool_ref):
+    """
+    Background thread of a NoncePool. It only holds a weak reference to the
+    pool, so that the pool can be garbage collected while it is waiting.
+    """
+    while True:
+        pool = pool_ref()
+        if pool is None:
+            return
+        refill = pool._refill
+        del pool
+        # Wake up now and then to notice that the pool has gone away.
+        if not refill.wait(timeout=1.0):
+            continue
+        pool = pool_ref()
+        if pool is None or pool._closed:
+            return
+        refill.clear()
+        pool.fill()
+        del pool
+
+
+def _empty_pools_after_fork():
+    for pool in list(_POOLS):
+        pool._reset()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_empty_pools_after_fork)
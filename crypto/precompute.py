@@ -0,0 +1,411 @@
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from hashlib import sha256
+from multiprocessing import resource_tracker, shared_memory
+
+from crypto.backend import get_backend
+from crypto.ec import (
+    Point,
+    _JACOBIAN_INFINITY,
+    _jacobian_add,
+    _jacobian_add_affine,
+    _jacobian_double,
+    _normalize_all,
+    _to_affine,
+)
+
+# Radix of the default generator table is 2^DEFAULT_WINDOW. For 256-bit
+# curves a window of 4 bits gives 64 rows of 15 points each.
+DEFAULT_WINDOW = 4
+
+# Header of a MappedFixedBaseTable: magic, format version, window, number of
+# rows, bytes per coordinate and a fingerprint of the curve and point.
+_SHARED_HEADER = struct.Struct("<4sHHII32s")
+_SHARED_MAGIC = b"ECFB"
+_SHARED_VERSION = 1
+
+
+class FixedBaseTable:
+    """
+    FixedBaseTable speeds up multiplication of a fixed point P by arbitrary
+    scalars, which is what key generation and signing do with the generator.
+
+    Writing the scalar k in radix 2^w as k = sum(d_i * 2^(w*i)), the table
+    stores d * 2^(w*i) * P for every row i and every nonzero digit d, so that
+        k * P = sum(table[i][d_i])
+    needs no doublings at all and at most one (mixed) addition per digit.
+
+    A table with window w holds ceil(n / w) * (2^w - 1) affine points, where n
+    is the bit length of the order of P, so w trades memory for speed.
+    The table is only built on first use.
+    """
+
+    def __init__(self, point: Point, window: int = DEFAULT_WINDOW):
+        if window < 1:
+            raise ValueError(f"Window must be at least 1, got {window}")
+        if point.curve.q is None:
+            raise ValueError("Fixed base tables need a curve with a known order q")
+        if (1 << window) > point.curve.q:
+            raise ValueError(f"Window {window} is too large for order {point.curve.q}")
+        self.point = point
+        self.curve = point.curve
+        self.window = window
+        self.rows = -(-self.curve.q.bit_length() // window)
+        self._table = None
+
+    def _build(self):
+        curve = self.curve
+        size = (1 << self.window) - 1
+        multiples = []
+        base = self.point._jacobian()
+        for _ in range(self.rows):
+            multiple = _JACOBIAN_INFINITY
+            for _ in range(size):
+                multiple = _jacobian_add(multiple, base, curve)
+                multiples.append(multiple)
+            for _ in range(self.window):
+                base = _jacobian_double(base, curve)
+        points = [(x, y) for x, y, _ in _normalize_all(multiples, curve)]
+        return [points[i : i + size] for i in range(0, len(points), size)]
+
+    @property
+    def table(self):
+        self.build()
+        return self._table
+
+    def build(self):
+        """
+        Build the table now instead of on first use.
+        """
+        if self._table is None:
+            self._table = self._build()
+
+    def mul_jacobian(self, scalar: int):
+        """
+        Return scalar * P in Jacobian coordinates.
+        """
+        scalar %= self.curve.q
+        curve = self.curve
+        mask = (1 << self.window) - 1
+        result = _JACOBIAN_INFINITY
+        for row in self.table:
+            digit = scalar & mask
+            if digit:
+                result = _jacobian_add_affine(result, *row[digit - 1], curve)
+            scalar >>= self.window
+        return result
+
+    def mul(self, scalar: int):
+        """
+        Return scalar * P.
+        """
+        return _to_affine(self.mul_jacobian(scalar), self.curve)
+
+    def odd_multiples(self) -> list:
+        """
+        Return [P, 3P, ..., (2^w - 1)P] in Jacobian coordinates, suitable for
+        a wNAF of width w + 1. These are simply taken from the first row.
+        """
+        return [(x, y, 1) for x, y in self.table[0][::2]]
+
+    def __len__(self):
+        return self.rows * ((1 << self.window) - 1)
+
+
+class MappedFixedBaseTable(FixedBaseTable, ABC):
+    """
+    MappedFixedBaseTable is a FixedBaseTable whose points are read from
+    a buffer in a flat binary format, rather than kept as Python integers,
+    so the buffer can be shared memory or a memory mapped file.
+
+    After a header, the buffer holds the x and y coordinate of every point of
+    the table, row by row, each as a little-endian integer of a fixed number
+    of 64-bit limbs. Coordinates are read from the buffer as they are needed.
+
+    Subclasses provide the buffer through _load, which is called on first use.
+    """
+
+    def __init__(self, point: Point, window: int = DEFAULT_WINDOW):
+        super().__init__(point, window)
+        self.width = -(-self.curve.p.bit_length() // 64) * 8
+        self._buf = None
+        self._odd_multiples = None
+
+    @abstractmethod
+    def _load(self):
+        """
+        Attach the buffer holding the table with _attach.
+        """
+
+    def _attach(self, buf):
+        window, rows, width = _read_header(buf, self.point)
+        if (window, rows, width) != (self.window, self.rows, self.width):
+            raise ValueError(
+                f"Table has window {window}, {rows} rows and width {width}, "
+                f"expected {self.window}, {self.rows} and {self.width}"
+            )
+        end = _SHARED_HEADER.size + 2 * width * len(self)
+        self._buf = memoryview(buf)[_SHARED_HEADER.size : end].toreadonly()
+
+    def _data(self) -> memoryview:
+        self.build()
+        return self._buf
+
+    def build(self):
+        """
+        Load the buffer now instead of on first use.
+        """
+        if self._buf is None:
+            self._load()
+
+    def _point(self, buf, index: int):
+        mpz = get_backend().mpz
+        offset = 2 * self.width * index
+        middle = offset + self.width
+        return (
+            mpz(int.from_bytes(buf[offset:middle], "little")),
+            mpz(int.from_bytes(buf[middle : middle + self.width], "little")),
+        )
+
+    @property
+    def table(self):
+        buf = self._data()
+        size = (1 << self.window) - 1
+        return [
+            [self._point(buf, i * size + j) for j in range(size)]
+            for i in range(self.rows)
+        ]
+
+    def mul_jacobian(self, scalar: int):
+        scalar %= self.curve.q
+        curve = self.curve
+        buf = self._data()
+        size = (1 << self.window) - 1
+        result = _JACOBIAN_INFINITY
+        for i in range(self.rows):
+            digit = scalar & size
+            if digit:
+                x, y = self._point(buf, i * size + digit - 1)
+                result = _jacobian_add_affine(result, x, y, curve)
+            scalar >>= self.window
+        return result
+
+    def odd_multiples(self) -> list:
+        if self._odd_multiples is None:
+            buf = self._data()
+            size = (1 << self.window) - 1
+            self._odd_multiples = [
+                (*self._point(buf, i), 1) for i in range(0, size, 2)
+            ]
+        return self._odd_multiples
+
+
+class SharedFixedBaseTable(MappedFixedBaseTable):
+    """
+    SharedFixedBaseTable is a MappedFixedBaseTable stored in a block of
+    shared memory (see multiprocessing.shared_memory), so that the worker
+    processes of a pool can all use one copy of the table instead of each
+    building their own.
+
+    One process creates the table with create, the others attach to it by
+    name with attach. The creating process is responsible for calling unlink
+    once the table is no longer needed.
+    """
+
+    def __init__(self, point: Point, shm: shared_memory.SharedMemory):
+        window, _, _ = _read_header(shm.buf, point)
+        super().__init__(point, window)
+        self.shm = shm
+        self._attach(shm.buf)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @classmethod
+    def create(cls, point: Point, window: int = DEFAULT_WINDOW, name: str = None):
+        """
+        Build the table for point and window and copy it into a new block of
+        shared memory with the given name, or a random one.
+        """
+        data = _encode(point, window)
+        shm = shared_memory.SharedMemory(name, create=True, size=len(data))
+        shm.buf[: len(data)] = data
+        return cls(point, shm)
+
+    @classmethod
+    def attach(cls, name: str, point: Point):
+        """
+        Attach to the shared table with the given name, which must have been
+        created for the same point.
+
+        The block is not registered with this process's resource tracker,
+        which would unlink it when this process exits: only the creating
+        process owns it.
+        """
+        if sys.version_info >= (3, 13):
+            shm = shared_memory.SharedMemory(name, track=False)
+        else:
+            shm = _attach_untracked(name)
+        try:
+            return cls(point, shm)
+        except ValueError:
+            shm.close()
+            raise
+
+    def _load(self):
+        raise ValueError("Shared table is closed")
+
+    def close(self):
+        """
+        Detach this process from the shared table.
+        """
+        if self._buf is not None:
+            self._buf.release()
+            self._buf = None
+        self.shm.close()
+
+    def unlink(self):
+        """
+        Free the shared memory once every process has closed the table.
+        """
+        self.shm.unlink()
+
+
+class CachedFixedBaseTable(MappedFixedBaseTable):
+    """
+    CachedFixedBaseTable is a MappedFixedBaseTable kept in a file in the given
+    directory, so that processes after the first one memory map the table
+    instead of building it.
+
+    The file name is derived from a hash of the curve parameters, the point
+    and the window, and the file ends with a SHA-256 checksum of its contents.
+    If the file is missing, corrupt or was built for other parameters, the
+    table is built and the file is replaced atomically. If it cannot be
+    written, the table is kept in memory.
+    """
+
+    def __init__(self, point: Point, window: int, directory: str):
+        super().__init__(point, window)
+        self.directory = directory
+        self.path = os.path.join(
+            directory,
+            f"{_fingerprint(point).hex()[:32]}-w{window}-v{_SHARED_VERSION}.table",
+        )
+        self._map = None
+
+    def _load(self):
+        try:
+            self._attach(self._read())
+            return
+        except (OSError, ValueError):
+            pass
+        data = _encode(self.point, self.window)
+        data += sha256(data).digest()
+        try:
+            self._write(data)
+            self._attach(self._read())
+        except (OSError, ValueError):
+            self._attach(data)
+
+    def _read(self):
+        with open(self.path, "rb") as f:
+            m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        checksum = m[-32:] if len(m) >= 32 else b""
+        if sha256(memoryview(m)[:-32]).digest() != checksum:
+            m.close()
+            raise ValueError(f"Checksum mismatch in {self.path}")
+        self._map = m
+        return m
+
+    def _write(self, data: bytes):
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+
+# Serializes _attach_untracked, which swaps out resource_tracker.register.
+_attach_lock = threading.Lock()
+
+
+def _attach_untracked(name: str) -> shared_memory.SharedMemory:
+    """
+    Open the existing shared memory block with the given name without
+    registering it with the resource tracker, like track=False does from
+    Python 3.13 on. Registrations of other resources go through unchanged.
+    """
+    register = resource_tracker.register
+
+    def register_others(resource: str, rtype: str):
+        if rtype != "shared_memory" or resource.lstrip("/") != name.lstrip("/"):
+            register(resource, rtype)
+
+    with _attach_lock:
+        resource_tracker.register = register_others
+        try:
+            return shared_memory.SharedMemory(name)
+        finally:
+            resource_tracker.register = register
+
+
+def _encode(point: Point, window: int) -> bytes:
+    """
+    Return the table for point and window in the format read by
+    MappedFixedBaseTable.
+    """
+    table = point.curve.generator_table
+    if (
+        table is None
+        or isinstance(table, MappedFixedBaseTable)
+        or table.point is not point
+        or table.window != window
+    ):
+        table = FixedBaseTable(point, window)
+    width = -(-point.curve.p.bit_length() // 64) * 8
+    data = bytearray(
+        _SHARED_HEADER.pack(
+            _SHARED_MAGIC,
+            _SHARED_VERSION,
+            window,
+            table.rows,
+            width,
+            _fingerprint(point),
+        )
+    )
+    for row in table.table:
+        for x, y in row:
+            data += int(x).to_bytes(width, "little")
+            data += int(y).to_bytes(width, "little")
+    return bytes(data)
+
+
+def _fingerprint(point: Point) -> bytes:
+    curve = point.curve
+    values = (curve.p, curve.a % curve.p, curve.b, curve.q, point.x, point.y)
+    return sha256(repr(tuple(int(v) for v in values)).encode()).digest()
+
+
+def _read_header(buf, point: Point):
+    if len(buf) < _SHARED_HEADER.size:
+        raise ValueError("Buffer too small for a fixed base table")
+    magic, version, window, rows, width, fingerprint = _SHARED_HEADER.unpack_from(buf)
+    if magic != _SHARED_MAGIC or version != _SHARED_VERSION:
+        raise ValueError("Buffer does not hold a fixed base table")
+    if fingerprint != _fingerprint(point):
+        raise ValueError("Table was built for a different point")
+    if len(buf) < _SHARED_HEADER.size + 2 * width * rows * ((1 << window) - 1):
+        raise ValueError("Table is truncated")
+    return window, rows, width
@@ -1,6 +1,6 @@
 import secrets
 
-from crypto.ec import Curve, Point
+from crypto.ec import Curve, Point, batch_normalize
 
 
 def gen_private_key(curve: Curve) -> int:
@@ -9,7 +9,7 @@ def gen_private_key(curve: Curve) -> int:
     i.e the key lies within 0 < k < q where q is the prime order of the
     subgroup generated by the attached generator.
     """
-    return secrets.randbelow(curve.q)
+    return 1 + secrets.randbelow(int(curve.q) - 1)
 
 
 def gen_nonce(curve: Curve) -> int:
@@ -18,13 +18,33 @@ def gen_nonce(curve: Curve) -> int:
     0 < k < q where q is the prime order of the subgroup generated by
     the attached generator.
     """
-    return secrets.randbelow(curve.q)
+    return 1 + secrets.randbelow(int(curve.q) - 1)
 
 
-def gen_key_pair(curve: Curve) -> (int, Point):
+def gen_key_pair(curve: Curve, ladder: bool = True) -> (int, Point):
     """
     Generate a private, public key pair that is compatible with the
     given curve.
+
+    With ladder=True (the default) the public key is computed with the
+    Montgomery ladder, see Point.mul. ladder=False uses the faster fixed
+    base table.
     """
     secretKey = gen_private_key(curve)
-    return secretKey, secretKey * curve.generator
+    return secretKey, curve.generator.mul(secretKey, ladder=ladder)
+
+
+def gen_key_pairs(curve: Curve, n: int, ladder: bool = True) -> list:
+    """
+    Generate n private, public key pairs that are compatible with the
+    given curve, see gen_key_pair.
+
+    This is cheaper than calling gen_key_pair n times because the public keys
+    are converted to affine coordinates together, with a single inversion.
+    """
+    secretKeys = [gen_private_key(curve) for _ in range(n)]
+    publicKeys = batch_normalize(
+        [curve.generator._mul_jacobian(secretKey, ladder) for secretKey in secretKeys],
+        curve,
+    )
+    return list(zip(secretKeys, publicKeys))
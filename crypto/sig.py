@@ -1,8 +1,40 @@
+import mmap
+import os
+import secrets
+import stat
+from concurrent.futures import ProcessPoolExecutor
 from hashlib import sha256
 
-from crypto.ec import Curve, modinv, Point, Infinity
+from crypto.curves import get_curve
+from crypto.ec import (
+    Curve,
+    modinv,
+    Point,
+    INFINITY,
+    batch_inverse,
+    _jacobian_x_equals,
+    _lift_x,
+    _mul_terms,
+    _multi_mul,
+    _point_multiples,
+    _strauss_mul,
+    _to_affine,
+)
+from crypto.precompute import CachedFixedBaseTable, SharedFixedBaseTable
 from crypto.rand import gen_nonce
 
+# Bit length of the random multipliers used by ECDSA.verify_batch. A batch
+# containing an invalid signature passes with probability about 2^-128.
+BATCH_MULTIPLIER_BITS = 128
+
+# Number of bytes hashed at a time by sign_stream and verify_stream. hashlib
+# releases the GIL while hashing each chunk.
+STREAM_CHUNK_SIZE = 1 << 20
+
+# Number of chunks per worker process that sign_many and verify_many split
+# their input into by default, so that faster workers can take on more.
+CHUNKS_PER_WORKER = 4
+
 
 class ECDSA:
     """
@@ -18,30 +50,145 @@ class ECDSA:
     are all that is required to verify the signature.
     """
 
-    def __init__(self, curve: Curve, tries=10):
+    def __init__(
+        self,
+        curve: Curve,
+        tries=10,
+        ladder=True,
+        nonce_pool=None,
+        key_cache=None,
+        verify_cache=None,
+        hashfunc=sha256,
+    ):
+        """
+        With ladder=True (the default) the nonce is multiplied with the
+        Montgomery ladder when signing, see Point.mul. ladder=False uses the
+        faster fixed base table.
+
+        If a crypto.nonce.NoncePool for the same curve is given, sign takes
+        its nonces from the pool instead of computing them inline.
+
+        If a crypto.cache.PublicKeyTableCache is given, verify takes the
+        precomputed multiples of frequently used public keys from it.
+
+        If a crypto.cache.VerificationCache is given, signatures that verified
+        before are accepted by verify and verify_batch without verifying
+        them again.
+
+        Messages are hashed with hashfunc, a hashlib constructor such as
+        hashlib.sha256 (the default), hashlib.blake2b or hashlib.sha3_256.
+        Digests longer than the curve order are truncated to its bit length.
+        """
+        if nonce_pool is not None and nonce_pool.curve != curve:
+            raise ValueError(f"Curves not equal: {curve} != {nonce_pool.curve}")
         self.curve = curve
         self.tries = tries
+        self.ladder = ladder
+        self.nonce_pool = nonce_pool
+        self.key_cache = key_cache
+        self.verify_cache = verify_cache
+        self.hashfunc = hashfunc
+
+    def _hash(self, m) -> bytes:
+        """
+        Return the digest of m, which may be any bytes-like object.
+        """
+        return self.hashfunc(m).digest()
+
+    def _hash_stream(self, source) -> bytes:
+        """
+        Return the digest of the message read from source in chunks of at most
+        STREAM_CHUNK_SIZE bytes. Regular files given by path are memory mapped,
+        anything else, such as pipes and devices, is read.
+        """
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            raise TypeError(
+                "Streams are a path, a file object or an iterable of chunks, "
+                "use sign or verify for messages held in memory"
+            )
+        h = self.hashfunc()
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, "rb") as f:
+                st = os.fstat(f.fileno())
+                if stat.S_ISREG(st.st_mode) and st.st_size:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                        with memoryview(m) as view:
+                            for i in range(0, st.st_size, STREAM_CHUNK_SIZE):
+                                h.update(view[i : i + STREAM_CHUNK_SIZE])
+                else:
+                    _hash_readinto(h, f)
+        elif hasattr(source, "readinto"):
+            _hash_readinto(h, source)
+        elif hasattr(source, "read"):
+            chunk = source.read(STREAM_CHUNK_SIZE)
+            while chunk:
+                h.update(chunk)
+                chunk = source.read(STREAM_CHUNK_SIZE)
+        else:
+            for chunk in source:
+                h.update(chunk)
+        return h.digest()
 
-    def sign(self, m: bytes, private_key: int) -> (int, int):
+    def _digest_to_int(self, digest) -> int:
+        """
+        Return the integer z of the given digest, keeping its leftmost bits
+        if it is longer than the curve order.
+        """
+        z = int.from_bytes(digest, "big")
+        excess = len(digest) * 8 - self.curve.q.bit_length()
+        if excess > 0:
+            z >>= excess
+        return z
+
+    def sign(self, m: bytes, private_key: int, recoverable: bool = False):
         """
         sign signs the given message with the private key using the ECDSA
         algorithm.
 
         The output is the pair (r, s), which together represent the ECDSA
-        signature.
+        signature. With recoverable=True the output is (r, s, recid) instead,
+        where recid is the recovery id that recover_public_key needs to
+        compute the public key from the signature.
+
+        m may be bytes, bytearray or memoryview; it is hashed without copying.
+        """
+        return self.sign_digest(self._hash(m), private_key, recoverable)
+
+    def sign_digest(self, digest, private_key: int, recoverable: bool = False):
+        """
+        sign_digest is sign for a message that was already hashed with
+        hashfunc.
         """
         order = self.curve.q
+        z = self._digest_to_int(digest)
         for i in range(self.tries):
-            k = gen_nonce(self.curve)
-            R = k * self.curve.generator
-            r = R.x
-            s = (
-                (int(sha256(m).hexdigest(), 16) + private_key * r) * modinv(k, order)
-            ) % order
+            if self.nonce_pool is not None:
+                k_inv, r, recid = self.nonce_pool.take()
+            else:
+                k = gen_nonce(self.curve)
+                R = self.curve.generator.mul(k, ladder=self.ladder)
+                r = R.x % order
+                recid = (R.y & 1) | (2 if R.x >= order else 0)
+                k_inv = modinv(k, order)
+            s = ((z + private_key * r) * k_inv) % order
             # In the event that s is zero we have to re-generate a nonce
-            if s:
+            if r and s:
+                # The backend may compute with its own integer type
+                r, s, recid = int(r), int(s), int(recid)
+                if recoverable:
+                    return r, s, recid
                 return r, s
-        raise ValueError("Could not generate a signature in {self.tries} tries")
+        raise ValueError(f"Could not generate a signature in {self.tries} tries")
+
+    def sign_stream(self, source, private_key: int, recoverable: bool = False):
+        """
+        sign_stream is sign for a message read from source, which is a path
+        (str or os.PathLike), a binary file object or an iterable of
+        bytes-like chunks. The message is hashed as it is read, so it never
+        has to fit in memory. bytes are not taken as a path but rejected with
+        a TypeError.
+        """
+        return self.sign_digest(self._hash_stream(source), private_key, recoverable)
 
     def verify(self, r: int, s: int, m: bytes, publicKey: Point) -> bool:
         """
@@ -51,17 +198,384 @@ class ECDSA:
         verify returns True if and only if the given signature has been signed
         by the private key corresponding to the given public key.
         """
+        return self.verify_digest(r, s, self._hash(m), publicKey)
+
+    def verify_stream(self, r: int, s: int, source, publicKey: Point) -> bool:
+        """
+        verify_stream is verify for a message read from source, which is
+        a path, a binary file object or an iterable of bytes-like chunks.
+        """
+        return self.verify_digest(r, s, self._hash_stream(source), publicKey)
+
+    def verify_digest(self, r: int, s: int, digest, publicKey: Point) -> bool:
+        """
+        verify_digest is verify for a message that was already hashed with
+        hashfunc.
+        """
         self._verify_params(publicKey)
-        w = modinv(s, self.curve.q)
-        u1 = w * int(sha256(m).hexdigest(), 16) % self.curve.q
-        u2 = w * r % self.curve.q
-        P = (u1 * self.curve.generator) + (u2 * publicKey)
-        if P.x == (r % self.curve.q):
-            return True
+        q = self.curve.q
+        if not (0 < r < q and 0 < s < q):
+            return False
+        key = None
+        if self.verify_cache is not None:
+            key = self.verify_cache.key(publicKey, digest, r, s)
+            if self.verify_cache.check(key):
+                return True
+        w = modinv(s, q)
+        u1 = w * self._digest_to_int(digest) % q
+        u2 = w * r % q
+        if not self._verify_u(r, u1, u2, publicKey):
+            return False
+        if key is not None:
+            self.verify_cache.add(key)
+        return True
+
+    def _verify_u(self, r: int, u1: int, u2: int, publicKey: Point) -> bool:
+        """
+        Return True if and only if u1 * G + u2 * publicKey has x coordinate
+        r modulo q.
+        """
+        q = self.curve.q
+        if self.key_cache is not None:
+            multiples, mapped = self.key_cache.lookup(publicKey)
+        else:
+            multiples, mapped = _point_multiples(publicKey), None
+        # u1 * G + u2 * publicKey with a single shared chain of doublings
+        P = _strauss_mul(
+            _mul_terms(u1, _point_multiples(self.curve.generator), self.curve)
+            + _mul_terms(u2, multiples, self.curve, mapped),
+            self.curve,
+        )
+        # The x coordinate of P is only known modulo q, so both x = r and,
+        # if it is still a field element, x = r + q are valid.
+        x = r
+        while x < self.curve.p:
+            if _jacobian_x_equals(P, x, self.curve):
+                return True
+            x += q
         return False
 
+    def verify_batch(self, items) -> list:
+        """
+        verify_batch verifies many signatures at once and returns a list
+        holding, for every item, whether verify would accept it.
+
+        Each item is a tuple (r, s, m, publicKey, recid), where recid, the
+        recovery id returned by sign(..., recoverable=True), may be left out
+        or None. Signatures that come with a recovery id are checked together:
+        the point R of every signature is recovered from r and recid, and with
+        random multipliers z_i
+            sum(z_i * R_i) = sum(z_i * u1_i) * G + sum(z_i * u2_i * publicKey_i)
+        is checked with a single multi-scalar multiplication. If it does not
+        hold, the batch is split in halves until the invalid signatures are
+        found. Signatures without a recovery id are verified one at a time.
+        """
+        q = self.curve.q
+        cache = self.verify_cache
+        results = [False] * len(items)
+        candidates = []
+        keys = {}
+        for i, item in enumerate(items):
+            r, s, m, publicKey = item[:4]
+            recid = item[4] if len(item) > 4 else None
+            self._verify_params(publicKey)
+            if not (0 < r < q and 0 < s < q):
+                continue
+            R = None if recid is None else self._recover_point(r, recid)
+            if R is None:
+                results[i] = self.verify(r, s, m, publicKey)
+                continue
+            digest = self._hash(m)
+            if cache is not None:
+                keys[i] = cache.key(publicKey, digest, r, s)
+                if cache.check(keys[i]):
+                    results[i] = True
+                    continue
+            candidates.append((i, r, s, digest, publicKey, R))
+
+        batch = []
+        inverses = batch_inverse([s for _, _, s, _, _, _ in candidates], q)
+        for (i, r, _, digest, publicKey, R), w in zip(candidates, inverses):
+            u1 = w * self._digest_to_int(digest) % q
+            u2 = w * r % q
+            batch.append((i, r, u1, u2, publicKey, R))
+        self._verify_bisect(batch, results)
+        if cache is not None:
+            for i, *_ in candidates:
+                if results[i]:
+                    cache.add(keys[i])
+        return results
+
+    def _verify_bisect(self, batch, results):
+        if not batch:
+            return
+        if len(batch) == 1:
+            i, r, u1, u2, publicKey, _ = batch[0]
+            results[i] = self._verify_u(r, u1, u2, publicKey)
+            return
+
+        q = self.curve.q
+        generator = 0
+        terms = []
+        for _, _, u1, u2, publicKey, R in batch:
+            z = secrets.randbits(BATCH_MULTIPLIER_BITS) | 1
+            generator += z * u1
+            terms.append((z, R))
+            terms.append((-z * u2 % q, publicKey))
+        if generator % q:
+            terms.append((-generator % q, self.curve.generator))
+
+        if not _multi_mul(terms, self.curve)[2]:
+            for i, *_ in batch:
+                results[i] = True
+            return
+
+        half = len(batch) // 2
+        self._verify_bisect(batch[:half], results)
+        self._verify_bisect(batch[half:], results)
+
+    def process_pool(
+        self, max_workers: int = None, shared_table: SharedFixedBaseTable = None
+    ) -> ProcessPoolExecutor:
+        """
+        Return a ProcessPoolExecutor for sign_many and verify_many whose
+        workers each set up this curve and build its generator table once,
+        when they start. Reusing a pool across calls saves that setup.
+
+        If a SharedFixedBaseTable of the generator is given, the workers
+        attach to it instead of building a table of their own.
+
+        Only curves returned by crypto.curves.get_curve are supported, as the
+        workers look the curve up by name, together with its window and table
+        cache directory.
+        """
+        if self.curve.name is None:
+            raise ValueError(f"Curve {self.curve} has no name to look it up by")
+        table = self.curve.generator_table
+        if shared_table is not None:
+            if shared_table.point != self.curve.generator:
+                raise ValueError("Shared table is not a table of the generator")
+            table = shared_table
+        return ProcessPoolExecutor(
+            max_workers,
+            initializer=_init_worker,
+            initargs=(
+                self.curve.name,
+                table.window if table is not None else 0,
+                self.tries,
+                self.ladder,
+                self.hashfunc,
+                shared_table.name if shared_table is not None else None,
+                table.directory if isinstance(table, CachedFixedBaseTable) else None,
+            ),
+        )
+
+    def sign_many(
+        self,
+        messages,
+        private_key: int,
+        recoverable: bool = False,
+        executor: ProcessPoolExecutor = None,
+        max_workers: int = None,
+        chunksize: int = None,
+    ) -> list:
+        """
+        sign_many signs every message with the private key, spread over worker
+        processes, and returns the signatures in order, as sign would.
+
+        Messages are sent to the workers in chunks of chunksize messages and
+        the signatures come back as one byte string per chunk. executor is
+        a pool returned by process_pool; if it is left out, a pool of
+        max_workers processes is started for this call.
+        """
+        size = (self.curve.q.bit_length() + 7) // 8
+        key = private_key.to_bytes(size, "big")
+        chunks = _chunks(list(messages), chunksize, max_workers)
+        record = 2 * size + (1 if recoverable else 0)
+        signatures = []
+        for data in self._map(
+            _sign_chunk,
+            [(key, chunk, recoverable) for chunk in chunks],
+            executor,
+            max_workers,
+        ):
+            for i in range(0, len(data), record):
+                r = int.from_bytes(data[i : i + size], "big")
+                s = int.from_bytes(data[i + size : i + 2 * size], "big")
+                if recoverable:
+                    signatures.append((r, s, data[i + record - 1]))
+                else:
+                    signatures.append((r, s))
+        return signatures
+
+    def verify_many(
+        self,
+        items,
+        executor: ProcessPoolExecutor = None,
+        max_workers: int = None,
+        chunksize: int = None,
+    ) -> list:
+        """
+        verify_many is verify_batch spread over worker processes. Items are
+        sent to the workers in chunks of chunksize items, with public keys and
+        signatures encoded as bytes, and each chunk is checked with
+        verify_batch. See sign_many for executor and max_workers.
+        """
+        q = self.curve.q
+        size = (q.bit_length() + 7) // 8
+        results = [False] * len(items)
+        indices = []
+        encoded = []
+        for i, item in enumerate(items):
+            r, s, m, publicKey = item[:4]
+            recid = item[4] if len(item) > 4 else None
+            self._verify_params(publicKey)
+            if not (0 < r < q and 0 < s < q):
+                continue
+            indices.append(i)
+            encoded.append(
+                (
+                    r.to_bytes(size, "big") + s.to_bytes(size, "big"),
+                    m,
+                    publicKey.to_bytes(compressed=False),
+                    recid,
+                )
+            )
+        chunks = _chunks(encoded, chunksize, max_workers)
+        verified = b"".join(self._map(_verify_chunk, chunks, executor, max_workers))
+        for i, ok in zip(indices, verified):
+            results[i] = bool(ok)
+        return results
+
+    def _map(self, function, chunks, executor, max_workers) -> list:
+        if not chunks:
+            return []
+        if executor is not None:
+            return list(executor.map(function, chunks))
+        with self.process_pool(max_workers) as executor:
+            return list(executor.map(function, chunks))
+
+    def recover_public_key(self, r: int, s: int, recid: int, m: bytes) -> Point:
+        """
+        recover_public_key computes the public key whose private key signed
+        the message m with the signature (r, s), given the signature's
+        recovery id as returned by sign(..., recoverable=True).
+
+        With R the point recovered from r and recid and z the hash of m,
+        the public key is r^-1 * (s * R - z * G), which costs one square root
+        and one joint two-scalar multiplication.
+
+        If no public key can be recovered a ValueError is raised.
+        """
+        q = self.curve.q
+        if not (0 < r < q and 0 < s < q):
+            raise ValueError("Signature values out of range")
+        R = self._recover_point(r, recid)
+        if R is None:
+            raise ValueError(f"No point with r = {r} and recovery id {recid}")
+        w = modinv(r, q)
+        u1 = -w * self._digest_to_int(self._hash(m)) % q
+        u2 = w * s % q
+        publicKey = _to_affine(
+            _strauss_mul(
+                _mul_terms(u1, _point_multiples(self.curve.generator), self.curve)
+                + _mul_terms(u2, _point_multiples(R), self.curve),
+                self.curve,
+            ),
+            self.curve,
+        )
+        if publicKey is INFINITY:
+            raise ValueError("Recovered public key is point at infinity")
+        return publicKey
+
+    def _recover_point(self, r: int, recid: int):
+        """
+        Return the point R of a signature from its r and recovery id, or None
+        if there is no such point.
+
+        Bit 0 of the recovery id is the parity of R's y coordinate and bit 1 is
+        set if R's x coordinate is r + q rather than r.
+        """
+        x = r + self.curve.q if recid & 2 else r
+        if x >= self.curve.p:
+            return None
+        return _lift_x(x, recid & 1, self.curve)
+
     def _verify_params(self, publicKey: Point):
-        if publicKey == Infinity():
+        if publicKey is INFINITY:
             raise ValueError("Public key is point at infinity")
         if not self.curve.is_point(publicKey.x, publicKey.y):
             raise ValueError("Public key is not on curve")
+
+
+def _hash_readinto(h, f):
+    """
+    Feed everything read from the binary file object f to the hash h, reading
+    into a single buffer of STREAM_CHUNK_SIZE bytes.
+    """
+    buf = bytearray(STREAM_CHUNK_SIZE)
+    with memoryview(buf) as view:
+        n = f.readinto(buf)
+        while n:
+            h.update(view[:n])
+            n = f.readinto(buf)
+
+
+def _chunks(items: list, chunksize: int, max_workers: int) -> list:
+    if chunksize is None:
+        workers = max_workers or os.cpu_count() or 1
+        chunksize = max(1, -(-len(items) // (workers * CHUNKS_PER_WORKER)))
+    return [items[i : i + chunksize] for i in range(0, len(items), chunksize)]
+
+
+# ECDSA instance of a worker process started by ECDSA.process_pool.
+_worker = None
+
+
+def _init_worker(
+    name: str,
+    window: int,
+    tries: int,
+    ladder: bool,
+    hashfunc,
+    shared_table: str,
+    cache_dir: str,
+):
+    global _worker
+    curve = get_curve(name, window, cache_dir)
+    if shared_table is not None:
+        curve.generator_table = SharedFixedBaseTable.attach(
+            shared_table, curve.generator
+        )
+    elif curve.generator_table is not None:
+        curve.generator_table.build()
+    _worker = ECDSA(curve, tries, ladder, hashfunc=hashfunc)
+
+
+def _sign_chunk(args) -> bytes:
+    key, messages, recoverable = args
+    size = (_worker.curve.q.bit_length() + 7) // 8
+    private_key = int.from_bytes(key, "big")
+    data = bytearray()
+    for m in messages:
+        signature = _worker.sign(m, private_key, recoverable)
+        data += signature[0].to_bytes(size, "big")
+        data += signature[1].to_bytes(size, "big")
+        if recoverable:
+            data.append(signature[2])
+    return bytes(data)
+
+
+def _verify_chunk(items) -> bytes:
+    curve = _worker.curve
+    size = (curve.q.bit_length() + 7) // 8
+    public_keys = {}
+    batch = []
+    for signature, m, encoding, recid in items:
+        publicKey = public_keys.get(encoding)
+        if publicKey is None:
+            publicKey = public_keys[encoding] = Point.from_bytes(encoding, curve)
+        r = int.from_bytes(signature[:size], "big")
+        s = int.from_bytes(signature[size:], "big")
+        batch.append((r, s, m, publicKey, recid))
+    return bytes(_worker.verify_batch(batch))
@@ -26,5 +26,6 @@ setup(
         "Programming Language :: Python :: 3",
     ],
     packages=find_packages(),
+    extras_require={"gmpy2": ["gmpy2"]},
     test_suite="setup.test_suite",
 )
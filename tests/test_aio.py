@@ -0,0 +1,56 @@
+import asyncio
+from unittest import TestCase
+
+from crypto.aio import AsyncECDSA
+from crypto.curves import get_curve
+from crypto.rand import gen_key_pair
+from crypto.sig import ECDSA
+
+
+class TestAsyncECDSA(TestCase):
+    def setUp(self):
+        self.curve = get_curve("secp256k1")
+        self.ecdsa = ECDSA(self.curve, ladder=False)
+        self.private_key, self.public_key = gen_key_pair(self.curve)
+
+    def test_sign_verify(self):
+        batches = []
+        verify_batch = self.ecdsa.verify_batch
+
+        def record(items):
+            batches.append(len(items))
+            return verify_batch(items)
+
+        self.ecdsa.verify_batch = record
+        aecdsa = AsyncECDSA(self.ecdsa, max_batch=8)
+
+        async def run():
+            messages = [bytes([i]) for i in range(10)]
+            signatures = await asyncio.gather(
+                *(aecdsa.sign(m, self.private_key, recoverable=True) for m in messages)
+            )
+            results = await asyncio.gather(
+                *(
+                    aecdsa.verify(r, s, m, self.public_key, recid)
+                    for m, (r, s, recid) in zip(messages, signatures)
+                ),
+                aecdsa.verify(*signatures[0][:2], b"forged", self.public_key),
+            )
+            return results
+
+        results = asyncio.run(run())
+        self.assertEqual(results, [True] * 10 + [False])
+        self.assertEqual(batches, [8, 3])
+
+    def test_process_pool(self):
+        async def run(aecdsa):
+            r, s = await aecdsa.sign(b"hello", self.private_key)
+            return await asyncio.gather(
+                aecdsa.verify(r, s, b"hello", self.public_key),
+                aecdsa.verify(r, s, b"goodbye", self.public_key),
+            )
+
+        with self.ecdsa.process_pool(1) as executor:
+            aecdsa = AsyncECDSA(self.ecdsa, executor, max_in_flight=1)
+            results = asyncio.run(run(aecdsa))
+        self.assertEqual(results, [True, False])
@@ -0,0 +1,58 @@
+import json
+import os
+import unittest
+from unittest import TestCase, mock
+
+import crypto.backend
+from crypto.backend import BACKEND_ENV_VAR, get_backend, set_backend
+from crypto.curves import get_curve
+from crypto.ec import Point
+from crypto.sig import ECDSA
+
+try:
+    import gmpy2
+except ImportError:
+    gmpy2 = None
+
+
+class TestBackend(TestCase):
+    def setUp(self):
+        self.saved = crypto.backend._backend
+
+    def tearDown(self):
+        crypto.backend._backend = self.saved
+
+    def test_python_backend(self):
+        backend = set_backend("python")
+        self.assertIs(get_backend(), backend)
+        self.assertEqual(backend.invert(3, 7), 5)
+        self.assertEqual(backend.powmod(3, 3, 7), 6)
+        curve = get_curve("secp256k1")
+        self.assertIs(type(curve.p), int)
+
+    def test_environment_variable(self):
+        crypto.backend._backend = None
+        with mock.patch.dict(os.environ, {BACKEND_ENV_VAR: "python"}):
+            self.assertEqual(get_backend().name, "python")
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            set_backend("gmp")
+
+    @unittest.skipUnless(gmpy2, "gmpy2 is not installed")
+    def test_gmpy2_backend(self):
+        set_backend("gmpy2")
+        curve = get_curve("secp256k1")
+        self.assertIsInstance(curve.p, type(gmpy2.mpz(0)))
+        ecdsa = ECDSA(curve)
+        r, s = ecdsa.sign(b"hello", 12345)
+        public_key = 12345 * curve.generator
+        self.assertTrue(ecdsa.verify(r, s, b"hello", public_key))
+        # Results are plain ints, not the backend's integer type
+        r, s, recid = ecdsa.sign(b"hello", 12345, recoverable=True)
+        recovered = ecdsa.recover_public_key(r, s, recid, b"hello")
+        for value in (r, s, recid, public_key.x, public_key.y, recovered.x):
+            self.assertIs(type(value), int)
+        decoded = Point.from_bytes(public_key.to_bytes(), curve)
+        self.assertIs(type(decoded.y), int)
+        json.dumps([r, s, public_key.x, public_key.y])
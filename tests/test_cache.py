@@ -0,0 +1,96 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from crypto.cache import PublicKeyTableCache, VerificationCache
+from crypto.curves import get_curve
+from crypto.rand import gen_key_pairs
+from crypto.sig import ECDSA
+
+
+class TestPublicKeyTableCache(TestCase):
+    def setUp(self):
+        self.curve = get_curve("secp256k1")
+        self.keys = gen_key_pairs(self.curve, 3, ladder=False)
+
+    def test_verify_with_cache(self):
+        cache = PublicKeyTableCache()
+        ecdsa = ECDSA(self.curve, ladder=False, key_cache=cache)
+        private_key, public_key = self.keys[0]
+        r, s = ecdsa.sign(b"hello", private_key)
+        for _ in range(4):
+            self.assertTrue(ecdsa.verify(r, s, b"hello", public_key))
+            self.assertFalse(ecdsa.verify(r, s, b"goodbye", public_key))
+        # Admitted on the second lookup, hit on all the others
+        self.assertEqual(cache.stats()["misses"], 2)
+        self.assertEqual(cache.stats()["hits"], 6)
+        self.assertEqual(len(cache), 1)
+
+    def test_eviction(self):
+        cache = PublicKeyTableCache(admit_after=1)
+        cache.lookup(self.keys[0][1])
+        cache.max_bytes = cache.size_bytes * 5 // 2
+        for _, public_key in self.keys:
+            cache.lookup(public_key)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.evictions, 1)
+        self.assertLessEqual(cache.size_bytes, cache.max_bytes)
+        # The least recently used key was evicted
+        cache.lookup(self.keys[0][1])
+        self.assertEqual(cache.misses, 4)
+
+
+class TestVerificationCache(TestCase):
+    def setUp(self):
+        self.curve = get_curve("secp256k1")
+        self.private_key, self.public_key = gen_key_pairs(self.curve, 1)[0]
+
+    def test_verify_with_cache(self):
+        cache = VerificationCache()
+        ecdsa = ECDSA(self.curve, ladder=False, verify_cache=cache)
+        r, s = ecdsa.sign(b"hello", self.private_key)
+        self.assertTrue(ecdsa.verify(r, s, b"hello", self.public_key))
+        self.assertTrue(ecdsa.verify(r, s, b"hello", self.public_key))
+        self.assertFalse(ecdsa.verify(r, s, b"goodbye", self.public_key))
+        self.assertFalse(ecdsa.verify(r, s, b"goodbye", self.public_key))
+        # Only the successful verification was cached
+        self.assertEqual(len(cache), 1)
+        self.assertEqual((cache.hits, cache.misses), (1, 3))
+        self.assertEqual(cache.hit_rate, 0.25)
+
+    def test_verify_batch_with_cache(self):
+        cache = VerificationCache()
+        ecdsa = ECDSA(self.curve, ladder=False, verify_cache=cache)
+        items = []
+        for m in (b"a", b"b", b"c"):
+            r, s, recid = ecdsa.sign(m, self.private_key, recoverable=True)
+            items.append((r, s, m, self.public_key, recid))
+        items.append((items[0][0], items[0][1], b"d", self.public_key, items[0][4]))
+        expected = [True, True, True, False]
+        self.assertEqual(ecdsa.verify_batch(items), expected)
+        self.assertEqual(len(cache), 3)
+        self.assertEqual(ecdsa.verify_batch(items), expected)
+        self.assertEqual(cache.hits, 3)
+
+    def test_eviction(self):
+        cache = VerificationCache(max_entries=2)
+        for key in (b"a", b"b", b"c"):
+            cache.add(key)
+        self.assertEqual(len(cache), 2)
+        self.assertFalse(cache.check(b"a"))
+        self.assertTrue(cache.check(b"c"))
+
+    def test_persistence(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "verified.db")
+            cache = VerificationCache(max_entries=2, path=path)
+            for key in (b"a", b"b", b"c"):
+                cache.add(key)
+            cache.close()
+
+            cache = VerificationCache(max_entries=2, path=path)
+            self.assertEqual(len(cache), 2)
+            self.assertTrue(cache.check(b"b"))
+            self.assertTrue(cache.check(b"c"))
+            self.assertFalse(cache.check(b"a"))
+            cache.close()
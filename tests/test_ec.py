@@ -1,6 +1,31 @@
+import os
+import subprocess
+import sys
+import tempfile
 from unittest import TestCase
 
 from crypto import Curve, Point
+from crypto.curves import get_curve
+from crypto.ec import (
+    PIPPENGER_THRESHOLD,
+    Infinity,
+    _point_multiples,
+    _strauss_mul,
+    _jacobian_double,
+    _jacobian_double_generic,
+    _to_affine,
+    batch_normalize,
+    decode_points,
+    multi_scalar_mul,
+    wnaf,
+)
+from crypto.precompute import (
+    DEFAULT_WINDOW,
+    CachedFixedBaseTable,
+    FixedBaseTable,
+    MappedFixedBaseTable,
+    SharedFixedBaseTable,
+)
 
 
 # TODO: add more tests
@@ -30,3 +55,408 @@ class TestCurve(TestCase):
         ]
         for point in test_cases:
             self.assertTrue(self.curve.is_point(point.x, point.y))
+
+
+class TestPointArithmetic(TestCase):
+    def setUp(self):
+        # The points of y^2 = x^3 + 2x + 2 mod 17 form a cyclic group of
+        # order 19, generated by (5, 1).
+        self.curve = Curve(2, 2, 17, q=19)
+        self.generator = Point(x=5, y=1, curve=self.curve)
+
+    def test_double(self):
+        self.assertEqual(self.generator.double(), Point(x=6, y=3, curve=self.curve))
+        self.assertEqual(self.generator.double(), self.generator + self.generator)
+
+    def test_add_inverse(self):
+        self.assertEqual(self.generator + Point(x=5, y=16, curve=self.curve), Infinity())
+
+    def test_scalar_mul(self):
+        expected = Infinity()
+        for k in range(40):
+            self.assertEqual(k * self.generator, expected)
+            expected = expected + self.generator
+
+    def test_secp256k1_scalar_mul(self):
+        curve = get_curve("secp256k1")
+        P = 2 * curve.generator
+        self.assertEqual(
+            P.x, 0xC6047F9441ED7D6D3045406E95C07CD85C778E4B8CEF3CA7ABAC09B95C709EE5
+        )
+        self.assertEqual(P, curve.generator.double())
+        self.assertEqual(curve.q * curve.generator, Infinity())
+        self.assertEqual((curve.q + 1) * curve.generator, curve.generator)
+
+
+class TestFixedBaseTable(TestCase):
+    def test_matches_generic_mul(self):
+        curve = get_curve("secp256k1", window=0)
+        G = curve.generator
+        # A copy of the generator that does not go through the table
+        P = Point(G.x, G.y, curve)
+        scalars = [0, 1, 2, 15, 16, 2**255 + 12345, curve.q - 1, curve.q, curve.q + 3]
+        for window in (1, 4, 6):
+            table = FixedBaseTable(G, window)
+            self.assertEqual(len(table), table.rows * (2**window - 1))
+            for k in scalars:
+                self.assertEqual(table.mul(k), k * P)
+
+    def test_build(self):
+        table = FixedBaseTable(get_curve("secp256k1").generator)
+        self.assertIsNone(table._table)
+        table.build()
+        self.assertEqual(len(table._table), table.rows)
+
+    def test_attached_to_generator(self):
+        curve = get_curve("secp256k1")
+        self.assertIsNotNone(curve.generator_table)
+        self.assertIsNone(get_curve("secp256k1", window=0).generator_table)
+        G = curve.generator
+        k = 0xDEADBEEF * 2**200 + 7
+        self.assertEqual(k * G, k * Point(G.x, G.y, curve))
+
+
+class TestSharedFixedBaseTable(TestCase):
+    def test_attach(self):
+        curve = get_curve("secp256k1")
+        G = curve.generator
+        shared = SharedFixedBaseTable.create(G, 5)
+        try:
+            table = SharedFixedBaseTable.attach(shared.name, G)
+            self.assertEqual(table.window, 5)
+            self.assertEqual(table.table, FixedBaseTable(G, 5).table)
+            self.assertEqual(
+                table.odd_multiples(), FixedBaseTable(G, 5).odd_multiples()
+            )
+            for k in (1, 2**255 + 12345, curve.q - 1):
+                self.assertEqual(table.mul(k), k * G)
+            table.close()
+            with self.assertRaises(ValueError):
+                SharedFixedBaseTable.attach(shared.name, 2 * G)
+        finally:
+            shared.close()
+            shared.unlink()
+
+    def test_attach_from_unrelated_process(self):
+        G = get_curve("secp256k1").generator
+        shared = SharedFixedBaseTable.create(G)
+        # The other interpreter already has a resource tracker of its own,
+        # which must not unlink the table when that interpreter or the
+        # workers of its pool exit.
+        script = (
+            "from multiprocessing import shared_memory\n"
+            "from crypto.curves import get_curve\n"
+            "from crypto.precompute import SharedFixedBaseTable\n"
+            "from crypto.sig import ECDSA\n"
+            "own = shared_memory.SharedMemory(create=True, size=16)\n"
+            "G = get_curve('secp256k1').generator\n"
+            f"table = SharedFixedBaseTable.attach({shared.name!r}, G)\n"
+            "assert table.mul(12345) == 12345 * G\n"
+            "ecdsa = ECDSA(G.curve)\n"
+            "with ecdsa.process_pool(1, shared_table=table) as executor:\n"
+            "    ecdsa.sign_many([b'hello'], 12345, executor=executor)\n"
+            "table.close()\n"
+            "own.close()\n"
+            "own.unlink()\n"
+        )
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env = dict(os.environ, PYTHONPATH=root)
+        try:
+            result = subprocess.run(
+                [sys.executable, "-c", script], env=env, capture_output=True, text=True
+            )
+            self.assertEqual(result.returncode, 0, result.stderr)
+            self.assertNotIn("leaked", result.stderr)
+            table = SharedFixedBaseTable.attach(shared.name, G)
+            self.assertEqual(table.mul(12345), 12345 * G)
+            table.close()
+        finally:
+            shared.close()
+            shared.unlink()
+
+
+class TestCachedFixedBaseTable(TestCase):
+    def test_mapped_table_is_abstract(self):
+        with self.assertRaises(TypeError):
+            MappedFixedBaseTable(get_curve("secp256k1").generator)
+
+    def test_file_cache(self):
+        with tempfile.TemporaryDirectory() as directory:
+            curve = get_curve("secp256k1", cache_dir=directory)
+            self.assertIsInstance(curve.generator_table, CachedFixedBaseTable)
+            self.assertIsNot(curve, get_curve("secp256k1"))
+            G = curve.generator
+            k = 2**255 + 12345
+            expected = FixedBaseTable(G).mul(k)
+            self.assertEqual(k * G, expected)
+            path = curve.generator_table.path
+            self.assertTrue(os.path.exists(path))
+
+            table = CachedFixedBaseTable(G, DEFAULT_WINDOW, directory)
+            self.assertEqual(table.mul(k), expected)
+            self.assertIsNotNone(table._map)
+
+            # A corrupt file is detected and replaced
+            with open(path, "rb") as f:
+                data = f.read()
+            with open(path, "r+b") as f:
+                f.seek(100)
+                f.write(b"\xff" * 8)
+            table = CachedFixedBaseTable(G, DEFAULT_WINDOW, directory)
+            self.assertEqual(table.mul(k), expected)
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), data)
+            self.assertEqual(CachedFixedBaseTable(G, 4, directory).mul(k), expected)
+            del curve, table
+
+
+class TestWNAF(TestCase):
+    def test_recoding(self):
+        for width in (2, 3, 4, 5, 6):
+            for k in list(range(200)) + [2**255 - 19, 0xDEADBEEFCAFEBABE]:
+                digits = wnaf(k, width)
+                self.assertEqual(sum(d << i for i, d in enumerate(digits)), k)
+                for i, d in enumerate(digits):
+                    if d:
+                        self.assertEqual(d % 2, 1)
+                        self.assertLess(abs(d), 2 ** (width - 1))
+                        self.assertFalse(any(digits[i + 1 : i + width]))
+
+    def test_neg_sub(self):
+        curve = Curve(2, 2, 17, q=19)
+        P = Point(x=5, y=1, curve=curve)
+        self.assertEqual(-P, Point(x=5, y=16, curve=curve))
+        self.assertEqual(P - P, Infinity())
+        self.assertEqual(3 * P - P, 2 * P)
+        self.assertEqual(-5 * P, 14 * P)
+        self.assertEqual(P - Infinity(), P)
+
+
+class TestStrauss(TestCase):
+    def test_matches_separate_muls(self):
+        curve = get_curve("secp256k1")
+        G = curve.generator
+        Q = 0xC0FFEE * G
+        for k1, k2 in [(1, 0), (0, 5), (12345, 2**200 + 1), (curve.q - 1, curve.q - 2)]:
+            P = _strauss_mul(
+                [(k1, _point_multiples(G)), (k2, _point_multiples(Q))], curve
+            )
+            self.assertEqual(_to_affine(P, curve), k1 * G + k2 * Q)
+
+
+class TestEndomorphism(TestCase):
+    def setUp(self):
+        self.curve = get_curve("secp256k1")
+        self.endomorphism = self.curve.endomorphism
+
+    def test_lambda_acts_as_beta(self):
+        G = self.curve.generator
+        P = self.endomorphism.lam * G
+        self.assertEqual((P.x, P.y), (self.endomorphism.beta * G.x % self.curve.p, G.y))
+
+    def test_decompose(self):
+        q = self.curve.q
+        for k in [0, 1, q - 1, 2**128, 2**255 + 0xABCDEF, 0xDEADBEEF**7 % q]:
+            k1, k2 = self.endomorphism.decompose(k)
+            self.assertEqual((k1 + k2 * self.endomorphism.lam) % q, k)
+            self.assertLessEqual(abs(k1).bit_length(), 129)
+            self.assertLessEqual(abs(k2).bit_length(), 129)
+
+    def test_glv_mul_matches_plain_mul(self):
+        G = self.curve.generator
+        Q = 0xC0FFEE * G
+        plain = Curve(self.curve.a, self.curve.b, self.curve.p, q=self.curve.q)
+        Q_plain = Point(Q.x, Q.y, plain)
+        for k in [1, 2, self.curve.q - 1, 2**255 + 0xABCDEF, -7]:
+            R = k * Q
+            R_plain = k * Q_plain
+            self.assertEqual((R.x, R.y), (R_plain.x, R_plain.y))
+
+
+class TestMultiScalarMul(TestCase):
+    def check(self, scalars, points):
+        expected = Infinity()
+        for k, P in zip(scalars, points):
+            R = k * P
+            if R != Infinity():
+                expected = R + expected
+        self.assertEqual(multi_scalar_mul(scalars, points), expected)
+
+    def test_secp256k1(self):
+        curve = get_curve("secp256k1")
+        points = [k * curve.generator for k in range(1, 41)]
+        scalars = [(-1) ** k * (0xDEADBEEF**k) % curve.q for k in range(1, 41)]
+        for n in (1, 2, 5, PIPPENGER_THRESHOLD, 40):
+            self.check(scalars[:n], points[:n])
+        self.check([-3, 5], points[:2])
+
+    def test_without_endomorphism(self):
+        curve = Curve(2, 2, 17, q=19)
+        G = Point(x=5, y=1, curve=curve)
+        points = [(k % 18 + 1) * G for k in range(50)]
+        scalars = [k * 7 - 100 for k in range(50)]
+        self.check(scalars, points)
+
+    def test_identity_and_errors(self):
+        curve = get_curve("secp256k1")
+        G = curve.generator
+        self.assertEqual(multi_scalar_mul([], []), Infinity())
+        self.assertEqual(multi_scalar_mul([0, 5], [G, Infinity()]), Infinity())
+        self.assertEqual(multi_scalar_mul([1, 1], [G, -G]), Infinity())
+        with self.assertRaises(ValueError):
+            multi_scalar_mul([1, 2], [G])
+
+
+class TestBatchNormalize(TestCase):
+    def test_matches_single_normalization(self):
+        curve = get_curve("secp256k1")
+        G = curve.generator
+        points = [G._mul_jacobian(k) for k in (1, 2, 0, 0xDEADBEEF, curve.q - 1)]
+        self.assertEqual(
+            batch_normalize(points, curve), [_to_affine(P, curve) for P in points]
+        )
+        self.assertEqual(batch_normalize([], curve), [])
+
+
+class TestSlots(TestCase):
+    def test_no_instance_dict(self):
+        curve = get_curve("secp256k1")
+        for obj in (curve, curve.generator, 2 * curve.generator, Infinity()):
+            self.assertFalse(hasattr(obj, "__dict__"))
+
+    def test_public_constructor_validates(self):
+        curve = Curve(2, 2, 17)
+        with self.assertRaises(ValueError):
+            Point(x=5, y=2, curve=curve)
+
+
+class TestInfinity(TestCase):
+    def setUp(self):
+        self.curve = Curve(2, 2, 17, q=19)
+        self.P = Point(x=5, y=1, curve=self.curve)
+
+    def test_singleton(self):
+        self.assertIs(Infinity(), Infinity())
+        self.assertIs(19 * self.P, Infinity())
+
+    def test_group_operations(self):
+        inf = Infinity()
+        self.assertIs(-inf, inf)
+        self.assertIs(inf + inf, inf)
+        self.assertIs(inf.double(), inf)
+        self.assertIs(5 * inf, inf)
+        self.assertIs(inf + self.P, self.P)
+        self.assertIs(self.P + inf, self.P)
+        self.assertEqual(inf - self.P, -self.P)
+        self.assertEqual(multi_scalar_mul([1, 1], [inf, self.P]), self.P)
+
+
+class TestCurveRegistry(TestCase):
+    def test_interned(self):
+        self.assertIs(get_curve("secp256k1"), get_curve("secp256k1"))
+        self.assertEqual(get_curve("secp256k1"), get_curve("secp256k1", window=0))
+        with self.assertRaises(ValueError):
+            get_curve("secp256r2")
+
+
+class TestDoublingFormulas(TestCase):
+    def test_selected_formulas(self):
+        self.assertEqual(get_curve("secp256k1").formulas, "a=0")
+        self.assertEqual(get_curve("secp256r1").formulas, "a=-3")
+        self.assertEqual(Curve(2, 2, 17).formulas, "generic")
+        self.assertEqual(Curve(-3, 3, 17).formulas, "a=-3")
+
+    def test_specialized_formulas_match_generic(self):
+        for name in ("secp256k1", "secp256r1"):
+            curve = get_curve(name)
+            P = curve.generator._mul_jacobian(0xDEADBEEF)
+            expected = _to_affine(_jacobian_double_generic(P, curve), curve)
+            self.assertEqual(_to_affine(_jacobian_double(P, curve), curve), expected)
+
+    def test_secp256r1(self):
+        curve = get_curve("secp256r1")
+        G = curve.generator
+        self.assertIs(curve.q * G, Infinity())
+        self.assertEqual(
+            (2 * G).x, 0x7CF27B188D034F7E8A52380304B51AC3C08969E277F21B35A60B48FC47669978
+        )
+
+
+class TestLadder(TestCase):
+    def test_small_curve(self):
+        curve = Curve(2, 2, 17, q=19)
+        P = Point(x=5, y=1, curve=curve)
+        for k in range(-40, 60):
+            self.assertEqual(P.mul(k, ladder=True), k * P)
+
+    def test_secp256k1(self):
+        curve = get_curve("secp256k1")
+        G = curve.generator
+        q = curve.q
+        for k in [0, 1, 2, 3, (q - 1) // 2, (q + 1) // 2, q - 2, q - 1, 2**255 + 12345]:
+            self.assertEqual(G.mul(k, ladder=True), k * G)
+
+
+class TestEncoding(TestCase):
+    def test_secp256k1_generator(self):
+        G = get_curve("secp256k1").generator
+        self.assertEqual(
+            G.to_bytes().hex(),
+            "0279be667ef9dcbbac55a06295ce870b07029bfcdb2dce28d959f2815b16f81798",
+        )
+        self.assertEqual(len(G.to_bytes(compressed=False)), 65)
+
+    def test_round_trip(self):
+        for name in ("secp256k1", "secp256r1"):
+            curve = get_curve(name)
+            for k in (1, 2, 3, 0xDEADBEEF, curve.q - 1):
+                P = k * curve.generator
+                for compressed in (True, False):
+                    data = P.to_bytes(compressed)
+                    self.assertEqual(Point.from_bytes(data, curve), P)
+                    self.assertEqual(Point.from_bytes(memoryview(data), curve), P)
+        self.assertIs(Point.from_bytes(Infinity().to_bytes(), curve), Infinity())
+
+    def test_tonelli_shanks(self):
+        # 17 = 1 mod 4, so decompression needs Tonelli-Shanks
+        curve = Curve(2, 2, 17, q=19)
+        P = Point(x=5, y=1, curve=curve)
+        for k in range(1, 19):
+            Q = k * P
+            self.assertEqual(Point.from_bytes(Q.to_bytes(), curve), Q)
+
+    def test_invalid(self):
+        curve = get_curve("secp256k1")
+        data = curve.generator.to_bytes(compressed=False)
+        invalid = [
+            b"",
+            b"\x05" + data[1:],
+            data[:-1],
+            data[:-1] + bytes([data[-1] ^ 1]),
+            b"\x02" + (curve.p).to_bytes(32, "big"),
+            # x = 5 is not on secp256k1, since 5^3 + 7 is not a square mod p
+            b"\x02" + (5).to_bytes(32, "big"),
+        ]
+        for encoding in invalid:
+            with self.assertRaises(ValueError):
+                Point.from_bytes(encoding, curve)
+
+    def test_decode_points(self):
+        curve = get_curve("secp256k1")
+        points = [k * curve.generator for k in range(1, 5)]
+        encodings = [P.to_bytes() for P in points]
+        self.assertEqual(decode_points(encodings, curve), points)
+        with self.assertRaisesRegex(ValueError, "index 2"):
+            decode_points(encodings[:2] + [b"\x02"], curve)
+        with self.assertRaisesRegex(ValueError, "index 1"):
+            decode_points(encodings[:1] + [b"\x00"], curve)
+        self.assertEqual(
+            decode_points([b"\x00"], curve, allow_infinity=True), [Infinity()]
+        )
+
+    def test_zero_y(self):
+        # (0, 0) is on y^2 = x^3 - x, and its y coordinate is even
+        curve = Curve(-1, 0, 23)
+        self.assertEqual(Point.from_bytes(b"\x02\x00", curve), Point(0, 0, curve))
+        with self.assertRaises(ValueError):
+            Point.from_bytes(b"\x03\x00", curve)
@@ -0,0 +1,52 @@
+import secrets
+from unittest import TestCase
+
+from crypto import Curve
+from crypto.curves import CURVES
+from crypto.field import (
+    PrimeField,
+    PseudoMersenneField,
+    SolinasField,
+    _signed_terms,
+    select_field,
+)
+
+
+class TestFields(TestCase):
+    def setUp(self):
+        self.secp256k1 = CURVES["secp256k1"]["modulus"]
+        self.secp256r1 = CURVES["secp256r1"]["modulus"]
+
+    def check_reduce(self, field):
+        p = field.p
+        values = [0, 1, p - 1, p, p + 1, -5, (p - 1) ** 2, (p - 1) ** 3]
+        values += [secrets.randbelow(p) * secrets.randbelow(p) for _ in range(100)]
+        for x in values:
+            self.assertEqual(field.reduce(x), x % p)
+
+    def test_pseudo_mersenne(self):
+        field = PseudoMersenneField(self.secp256k1)
+        self.assertEqual(field.c, 2**32 + 977)
+        self.check_reduce(field)
+
+    def test_solinas(self):
+        terms = _signed_terms(2**256 - self.secp256r1)
+        self.assertEqual(terms, [(1, 0), (-1, 96), (-1, 192), (1, 224)])
+        self.check_reduce(SolinasField(self.secp256r1, terms))
+
+    def test_select_field(self):
+        self.assertIs(type(select_field(17)), PrimeField)
+        self.assertIs(type(select_field(17, special=True)), PrimeField)
+        for p in (self.secp256k1, self.secp256r1):
+            self.assertIs(type(select_field(p)), PrimeField)
+        self.assertIs(
+            type(select_field(self.secp256k1, special=True)), PseudoMersenneField
+        )
+        self.assertIs(type(select_field(self.secp256r1, special=True)), SolinasField)
+
+    def test_curve_with_special_field(self):
+        params = CURVES["secp256k1"]
+        p = params["modulus"]
+        curve = Curve(params["a"], params["b"], p, field=select_field(p, special=True))
+        self.assertIsInstance(curve.field, PseudoMersenneField)
+        self.assertTrue(curve.is_point(*params["generator"]))
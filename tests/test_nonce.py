@@ -0,0 +1,71 @@
+import os
+import pickle
+import time
+import unittest
+from unittest import TestCase
+
+from crypto.curves import get_curve
+from crypto.nonce import NoncePool
+from crypto.rand import gen_key_pair
+from crypto.sig import ECDSA
+
+
+class TestNoncePool(TestCase):
+    def setUp(self):
+        self.curve = get_curve("secp256k1")
+        self.private_key, self.public_key = gen_key_pair(self.curve)
+
+    def test_sign_with_pool(self):
+        pool = NoncePool(self.curve, size=8, background=False)
+        pool.fill()
+        self.assertEqual(len(pool), 8)
+        ecdsa = ECDSA(self.curve, nonce_pool=pool)
+        signatures = set()
+        for i in range(10):
+            r, s, recid = ecdsa.sign(b"hello", self.private_key, recoverable=True)
+            self.assertTrue(ecdsa.verify(r, s, b"hello", self.public_key))
+            self.assertEqual(ecdsa.recover_public_key(r, s, recid, b"hello"), self.public_key)
+            signatures.add(r)
+        # The pool ran empty and nonces were computed inline, never reused
+        self.assertEqual(len(pool), 0)
+        self.assertEqual(len(signatures), 10)
+
+    def test_background_refill(self):
+        pool = NoncePool(self.curve, size=8, low_watermark=4, ladder=False)
+        self.addCleanup(pool.close)
+        pool.take()
+        deadline = time.monotonic() + 10
+        while len(pool) < 8 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(pool), 8)
+
+    def test_close_during_fill(self):
+        pool = NoncePool(self.curve, size=64, ladder=False, background=False)
+        generate = pool._generate
+
+        def generate_and_close(n):
+            nonces = generate(n)
+            pool.close()
+            return nonces
+
+        pool._generate = generate_and_close
+        pool.fill()
+        self.assertEqual(len(pool), 0)
+        pool.fill()
+        self.assertEqual(len(pool), 0)
+
+    def test_not_picklable(self):
+        pool = NoncePool(self.curve, size=1, background=False)
+        with self.assertRaises(TypeError):
+            pickle.dumps(pool)
+
+    @unittest.skipUnless(hasattr(os, "fork"), "needs os.fork")
+    def test_emptied_after_fork(self):
+        pool = NoncePool(self.curve, size=4, background=False)
+        pool.fill()
+        pid = os.fork()
+        if not pid:
+            os._exit(len(pool))
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(os.waitstatus_to_exitcode(status), 0)
+        self.assertEqual(len(pool), 4)
@@ -0,0 +1,200 @@
+import hashlib
+import io
+import os
+import tempfile
+import threading
+from unittest import TestCase, skipUnless
+
+from crypto.curves import get_curve
+from crypto.precompute import SharedFixedBaseTable
+from crypto.rand import gen_key_pair, gen_key_pairs
+from crypto.sig import ECDSA, STREAM_CHUNK_SIZE
+
+
+class TestECDSA(TestCase):
+    def setUp(self):
+        self.curve = get_curve("secp256k1")
+        self.ecdsa = ECDSA(self.curve)
+        self.private_key, self.public_key = gen_key_pair(self.curve)
+
+    def test_sign_verify(self):
+        r, s = self.ecdsa.sign(b"hello", self.private_key)
+        self.assertTrue(self.ecdsa.verify(r, s, b"hello", self.public_key))
+        self.assertFalse(self.ecdsa.verify(r, s, b"goodbye", self.public_key))
+
+    def test_sign_verify_digest(self):
+        digest = hashlib.sha256(b"hello").digest()
+        r, s = self.ecdsa.sign_digest(digest, self.private_key)
+        self.assertTrue(self.ecdsa.verify(r, s, b"hello", self.public_key))
+        self.assertTrue(
+            self.ecdsa.verify_digest(r, s, memoryview(digest), self.public_key)
+        )
+        r, s = self.ecdsa.sign(bytearray(b"hello"), self.private_key)
+        self.assertTrue(self.ecdsa.verify(r, s, memoryview(b"hello"), self.public_key))
+
+    def test_sign_verify_stream(self):
+        data = os.urandom(3 * STREAM_CHUNK_SIZE + 1)
+        r, s = self.ecdsa.sign(data, self.private_key)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "data")
+            with open(path, "wb") as f:
+                f.write(data)
+            self.assertTrue(self.ecdsa.verify_stream(r, s, path, self.public_key))
+            r2, s2 = self.ecdsa.sign_stream(path, self.private_key)
+            self.assertTrue(self.ecdsa.verify(r2, s2, data, self.public_key))
+            with open(path, "rb") as f:
+                self.assertTrue(self.ecdsa.verify_stream(r, s, f, self.public_key))
+        chunks = [data[i : i + 1000] for i in range(0, len(data), 1000)]
+        self.assertTrue(self.ecdsa.verify_stream(r, s, chunks, self.public_key))
+        self.assertFalse(
+            self.ecdsa.verify_stream(r, s, io.BytesIO(data[:-1]), self.public_key)
+        )
+        r, s = self.ecdsa.sign_stream(io.BytesIO(b""), self.private_key)
+        self.assertTrue(self.ecdsa.verify(r, s, b"", self.public_key))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "empty")
+            open(path, "wb").close()
+            self.assertTrue(self.ecdsa.verify_stream(r, s, path, self.public_key))
+
+    def test_sign_verify_many(self):
+        messages = [bytes([i]) for i in range(20)]
+        with self.ecdsa.process_pool(max_workers=2) as executor:
+            signatures = self.ecdsa.sign_many(
+                messages, self.private_key, recoverable=True, executor=executor
+            )
+            for m, (r, s, recid) in zip(messages, signatures):
+                self.assertTrue(self.ecdsa.verify(r, s, m, self.public_key))
+                self.assertEqual(
+                    self.ecdsa.recover_public_key(r, s, recid, m), self.public_key
+                )
+            items = [
+                (r, s, m, self.public_key, recid)
+                for m, (r, s, recid) in zip(messages, signatures)
+            ]
+            items[3] = items[3][:2] + (b"forged", self.public_key)
+            items[5] = (0,) + items[5][1:]
+            expected = [i not in (3, 5) for i in range(len(items))]
+            self.assertEqual(
+                self.ecdsa.verify_many(items, executor=executor, chunksize=3), expected
+            )
+        shared = SharedFixedBaseTable.create(self.curve.generator)
+        try:
+            with self.ecdsa.process_pool(1, shared_table=shared) as executor:
+                [(r, s)] = self.ecdsa.sign_many(
+                    messages[:1], self.private_key, executor=executor
+                )
+            self.assertTrue(self.ecdsa.verify(r, s, messages[0], self.public_key))
+        finally:
+            shared.close()
+            shared.unlink()
+        signatures = self.ecdsa.sign_many(messages[:2], self.private_key, max_workers=1)
+        self.assertEqual(len(signatures), 2)
+        self.assertTrue(self.ecdsa.verify(*signatures[1], messages[1], self.public_key))
+
+    def test_process_pool_cache_dir(self):
+        with tempfile.TemporaryDirectory() as directory:
+            curve = get_curve("secp256k1", cache_dir=directory)
+            ecdsa = ECDSA(curve, ladder=False)
+            with ecdsa.process_pool(1) as executor:
+                [(r, s)] = ecdsa.sign_many(
+                    [b"hello"], self.private_key, executor=executor
+                )
+            self.assertTrue(ecdsa.verify(r, s, b"hello", self.public_key))
+            # The worker built the table in the parent's cache directory
+            self.assertTrue(os.path.exists(curve.generator_table.path))
+
+    @skipUnless(hasattr(os, "mkfifo"), "needs named pipes")
+    def test_stream_fifo(self):
+        data = os.urandom(STREAM_CHUNK_SIZE + 17)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "fifo")
+            os.mkfifo(path)
+
+            def write():
+                with open(path, "wb") as f:
+                    f.write(data)
+
+            writer = threading.Thread(target=write)
+            writer.start()
+            r, s = self.ecdsa.sign_stream(path, self.private_key)
+            writer.join()
+        self.assertTrue(self.ecdsa.verify(r, s, data, self.public_key))
+        self.assertFalse(self.ecdsa.verify(r, s, b"", self.public_key))
+
+    def test_stream_rejects_bytes(self):
+        with self.assertRaises(TypeError):
+            self.ecdsa.sign_stream(b"hello", self.private_key)
+
+    def test_hashfunc(self):
+        for hashfunc in (hashlib.blake2b, hashlib.sha3_256):
+            ecdsa = ECDSA(self.curve, hashfunc=hashfunc)
+            r, s = ecdsa.sign(b"hello", self.private_key)
+            self.assertTrue(ecdsa.verify(r, s, b"hello", self.public_key))
+            self.assertFalse(self.ecdsa.verify(r, s, b"hello", self.public_key))
+        # A 512 bit digest is truncated to its leftmost 256 bits
+        digest = hashlib.blake2b(b"hello").digest()
+        r, s = self.ecdsa.sign_digest(digest[:32], self.private_key)
+        self.assertTrue(self.ecdsa.verify_digest(r, s, digest, self.public_key))
+
+    def test_verify_rejects_tampered_signature(self):
+        r, s = self.ecdsa.sign(b"hello", self.private_key)
+        q = self.curve.q
+        self.assertFalse(self.ecdsa.verify(r, (s + 1) % q, b"hello", self.public_key))
+        self.assertFalse(self.ecdsa.verify(r, 0, b"hello", self.public_key))
+        self.assertFalse(self.ecdsa.verify(r + q, s, b"hello", self.public_key))
+        _, other_public_key = gen_key_pair(self.curve)
+        self.assertFalse(self.ecdsa.verify(r, s, b"hello", other_public_key))
+
+    def test_without_generator_table(self):
+        curve = get_curve("secp256k1", window=0)
+        ecdsa = ECDSA(curve)
+        r, s = ecdsa.sign(b"hello", self.private_key)
+        self.assertTrue(ecdsa.verify(r, s, b"hello", self.public_key))
+        self.assertTrue(self.ecdsa.verify(r, s, b"hello", self.public_key))
+
+    def test_gen_key_pairs(self):
+        pairs = gen_key_pairs(self.curve, 5)
+        self.assertEqual(len(pairs), 5)
+        for private_key, public_key in pairs:
+            self.assertEqual(public_key, private_key * self.curve.generator)
+
+    def test_sign_without_ladder(self):
+        ecdsa = ECDSA(self.curve, ladder=False)
+        r, s = ecdsa.sign(b"hello", self.private_key)
+        self.assertTrue(self.ecdsa.verify(r, s, b"hello", self.public_key))
+        private_key, public_key = gen_key_pair(self.curve, ladder=False)
+        self.assertEqual(public_key, private_key * self.curve.generator)
+
+    def test_verify_batch(self):
+        items = []
+        for i, (private_key, public_key) in enumerate(gen_key_pairs(self.curve, 40)):
+            m = b"message %d" % i
+            r, s, recid = self.ecdsa.sign(m, private_key, recoverable=True)
+            items.append((r, s, m, public_key, recid))
+        self.assertEqual(self.ecdsa.verify_batch(items), [True] * len(items))
+
+        invalid = {3, 17, 18, 39}
+        tampered = [
+            (r, (s + 1) % self.curve.q if i in invalid else s, m, Q, recid)
+            for i, (r, s, m, Q, recid) in enumerate(items)
+        ]
+        # Wrong or missing recovery ids must not change the outcome
+        tampered[5] = tampered[5][:4] + (tampered[5][4] ^ 1,)
+        tampered[6] = tampered[6][:4]
+        tampered[7] = tampered[7][:4] + (None,)
+        expected = [i not in invalid for i in range(len(items))]
+        self.assertEqual(self.ecdsa.verify_batch(tampered), expected)
+        self.assertEqual(self.ecdsa.verify_batch([]), [])
+
+    def test_recover_public_key(self):
+        for i in range(10):
+            m = b"message %d" % i
+            r, s, recid = self.ecdsa.sign(m, self.private_key, recoverable=True)
+            self.assertEqual(
+                self.ecdsa.recover_public_key(r, s, recid, m), self.public_key
+            )
+            self.assertNotEqual(
+                self.ecdsa.recover_public_key(r, s, recid ^ 1, m), self.public_key
+            )
+        with self.assertRaises(ValueError):
+            self.ecdsa.recover_public_key(0, s, recid, m)